@@ -28,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chat.instrumentation.InstrumentationMiddleware',
+    'chat.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -58,12 +60,60 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'Backend_chat.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database profile, chosen with DB_PROFILE:
+#   sqlite         (default) SQLite in WAL mode with the SQLITE_PRAGMAS below
+#   sqlite-legacy  SQLite with the rollback journal (the old behaviour)
+#   postgres       PostgreSQL from POSTGRES_* variables; persistent connections,
+#                  or a psycopg connection pool with DB_POOL=1
+DB_PROFILE = os.getenv('DB_PROFILE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
+if DB_PROFILE == 'postgres':
+    DB_POOL = os.getenv('DB_POOL', '0') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'chat'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            # A pool hands out connections per request, so it replaces persistent ones
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+                'timeout': 10,
+            }} if DB_POOL else {},
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Wait for the write lock instead of failing with "database is locked"
+            'OPTIONS': {'timeout': 20},
+            # A file-backed test database so concurrency tests get real SQLite locking
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+    if DB_PROFILE == 'sqlite-legacy':
+        SQLITE_PRAGMAS = {'journal_mode': 'DELETE'}
+    else:
+        # Take the write lock at BEGIN so transactions never fail upgrading a read lock
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+        # Applied to every new connection by chat.db.apply_sqlite_pragmas
+        SQLITE_PRAGMAS = {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 20000,
+            'temp_store': 'MEMORY',
+            'cache_size': -20000,
+            'mmap_size': 134217728,
+        }
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -86,6 +136,94 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache-aside for token authentication and balance reads (see chat/user_cache.py).
+# Off by default: token deletions and user deactivations only clear the cache
+# of the process that made them, so with a per-process backend (LocMemCache)
+# other workers keep accepting a revoked token for up to USER_CACHE_TTL
+# seconds. Only enable it with a shared backend such as Redis.
+USER_CACHE = os.getenv('USER_CACHE', '0') == '1'
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TTL = 30
+USER_CACHE_BALANCE_TTL = 60
+
+# Threads used by the async views to run model inference off the event loop
+ASYNC_INFERENCE_WORKERS = int(os.getenv('ASYNC_INFERENCE_WORKERS', '4'))
+
+# Seconds between SSE keep-alive comments on /api/events/
+EVENT_STREAM_KEEPALIVE = 15
+# Seconds a single-use /api/events/ticket/ ticket stays valid
+EVENT_STREAM_TICKET_TTL = 30
+
+# Request instrumentation (chat/instrumentation.py): latency of every request
+# plus, for the sampled fraction, per-stage and SQL timings. /metrics is off
+# unless METRICS_TOKEN is set, and then requires "Authorization: Bearer
+# <token>". The Server-Timing response header exposes the breakdown to every
+# client, so it is off unless REQUEST_INSTRUMENTATION_SERVER_TIMING=1.
+REQUEST_INSTRUMENTATION = os.getenv('REQUEST_INSTRUMENTATION', '1') == '1'
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('REQUEST_INSTRUMENTATION_SAMPLE_RATE', '1.0'))
+REQUEST_INSTRUMENTATION_SERVER_TIMING = os.getenv('REQUEST_INSTRUMENTATION_SERVER_TIMING', '0') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# On-demand sampling profiler (chat/profiling.py), off unless PROFILING_TOKEN
+# is set. Send "X-Profile: <token>" to profile one request, plus
+# "X-Profile-Seconds: N" to profile the whole worker for N seconds. Collapsed
+# stacks are written to MEDIA_ROOT/profiles.
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN') or None
+PROFILING_INTERVAL = 0.001
+PROFILING_MAX_SECONDS = 60
+
+# Tokens debited per chat message
+CHAT_MESSAGE_COST = 100
+
+# Batch classification (POST /api/chat/classify/): one request may carry up
+# to CHAT_CLASSIFY_MAX_MESSAGES messages and costs
+# CHAT_CLASSIFY_REQUEST_COST + CHAT_CLASSIFY_MESSAGE_COST * len(messages).
+CHAT_CLASSIFY_MAX_MESSAGES = 1000
+CHAT_CLASSIFY_MAX_TOP_K = 10
+CHAT_CLASSIFY_REQUEST_COST = 100
+CHAT_CLASSIFY_MESSAGE_COST = 1
+
+# Write-behind persistence of Chat rows: rows are buffered in memory and
+# bulk-inserted every BATCH_SIZE rows or FLUSH_INTERVAL seconds. At most
+# MAX_PENDING rows can be lost if a worker crashes.
+CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', '0') == '1'
+CHAT_WRITE_BEHIND_BATCH_SIZE = 500
+CHAT_WRITE_BEHIND_FLUSH_INTERVAL = 0.5
+CHAT_WRITE_BEHIND_MAX_PENDING = 10000
+
+# Intent model artifact registry (see `manage.py train_intent_model`).
+# Set INTENT_MODEL_VERSION to pin workers to a specific bundle.
+INTENT_MODEL_DIR = Path(os.getenv('INTENT_MODEL_DIR', BASE_DIR / 'intent_models'))
+INTENT_MODEL_VERSION = os.getenv('INTENT_MODEL_VERSION') or None
+# Seconds between checks for a newly published bundle; 0 disables hot reload.
+INTENT_MODEL_RELOAD_INTERVAL = float(os.getenv('INTENT_MODEL_RELOAD_INTERVAL', '5'))
+
+# Unix socket of a `manage.py run_inference_pool` process. When set, web
+# workers send predictions there instead of loading the model themselves.
+INTENT_INFERENCE_POOL = os.getenv('INTENT_INFERENCE_POOL') or None
+# Seconds a web worker trusts the pool's model version before asking again
+INTENT_POOL_VERSION_TTL = 1.0
+
+# Micro-batching of concurrent predict_intent calls: a batch closes after
+# INTENT_BATCH_MAX_SIZE messages or INTENT_BATCH_MAX_WAIT_MS milliseconds.
+INTENT_BATCHING = os.getenv('INTENT_BATCHING', '0') == '1'
+INTENT_BATCH_MAX_SIZE = int(os.getenv('INTENT_BATCH_MAX_SIZE', '64'))
+INTENT_BATCH_MAX_WAIT_MS = float(os.getenv('INTENT_BATCH_MAX_WAIT_MS', '2'))
+
+# In-process LRU/TTL cache of predicted intents keyed on normalized message
+# text and model version. Name a CACHES alias in INTENT_CACHE_SHARED_BACKEND
+# to also share entries between workers.
+INTENT_CACHE = os.getenv('INTENT_CACHE', '1') == '1'
+INTENT_CACHE_MAX_ENTRIES = 10000
+INTENT_CACHE_TTL = 3600
+INTENT_CACHE_SHARED_BACKEND = os.getenv('INTENT_CACHE_SHARED_BACKEND') or None
+
 AUTH_USER_MODEL = 'chat.User'
 
 REST_FRAMEWORK = {
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from . import user_cache
+from .instrumentation import span
+from .chat_log import save_chat
+from .models import User
+
+
+# --- TOKEN ACCOUNTING ---
+def debit_tokens(user_id, cost):
+    """Atomically subtract ``cost`` tokens from a user's balance.
+
+    Runs a single conditional ``UPDATE ... WHERE tokens >= cost`` so concurrent
+    debits can never overdraw or lose an update, and only the ``tokens`` column
+    is written. Returns the new balance, or ``None`` if the balance was too low.
+    The cached balance is written through once the surrounding transaction
+    commits.
+    """
+    with span("debit"):
+        balance = _debit(user_id, cost)
+    if balance is not None and user_cache.enabled():
+        transaction.on_commit(lambda: user_cache.set_balance(user_id, balance))
+    return balance
+
+
+def _update_returning_supported():
+    """PostgreSQL and SQLite >= 3.35 support ``UPDATE ... RETURNING``; MySQL/MariaDB do not."""
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and connection.Database.sqlite_version_info >= (3, 35)
+
+
+def _debit(user_id, cost):
+    if _update_returning_supported():
+        qn = connection.ops.quote_name
+        table, tokens, pk = qn(User._meta.db_table), qn("tokens"), qn(User._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET {tokens} = {tokens} - %s WHERE {pk} = %s AND {tokens} >= %s RETURNING {tokens}",
+                [cost, user_id, cost],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    # The read must see this debit and no later one, so both run in one transaction
+    with transaction.atomic():
+        updated = User.objects.filter(pk=user_id, tokens__gte=cost).update(tokens=F("tokens") - cost)
+        if not updated:
+            return None
+        return User.objects.filter(pk=user_id).values_list("tokens", flat=True).get()
+
+
+def charge_message(user, message, response, cost):
+    """Debit ``cost`` tokens and store the chat exchange in one short transaction.
+
+    Returns the new balance, or ``None`` (and stores nothing) if the balance
+    was too low.
+    """
+    with transaction.atomic():
+        balance = debit_tokens(user.pk, cost)
+        if balance is not None:
+            save_chat(user, message, response)
+    return balance
+
+
+def classify_cost(n_messages):
+    """Tokens charged for one batch classification request of ``n_messages``."""
+    return (getattr(settings, "CHAT_CLASSIFY_REQUEST_COST", 100)
+            + getattr(settings, "CHAT_CLASSIFY_MESSAGE_COST", 1) * n_messages)
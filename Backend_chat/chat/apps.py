@@ -3,3 +3,16 @@ from django.apps import AppConfig
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .db import apply_sqlite_pragmas
+        from .instrumentation import install_query_hook
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='chat.db.sqlite_pragmas')
+
+        if getattr(settings, 'REQUEST_INSTRUMENTATION', True):
+            install_query_hook()
@@ -0,0 +1,184 @@
+import asyncio
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.authentication import get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .accounting import charge_message
+from .authentication import aauthenticate_credentials
+from .events import aredeem_ticket, broker, format_sse, issue_ticket
+from .models import User
+from .instrumentation import span
+from .views import predict_intent
+
+# --- ASYNC API VIEWS ---
+# Native async counterparts of the chat, balance and details actions for the
+# ASGI entry point. They run on the event loop without a thread hop per
+# request; only model inference is offloaded, to a bounded thread pool.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ASYNC_INFERENCE_WORKERS", 4),
+                    thread_name_prefix="inference",
+                )
+    return _executor
+
+
+def _token_key(request):
+    auth = get_authorization_header(request).split()
+    if len(auth) == 2 and auth[0].lower() == b"token":
+        return auth[1].decode()
+    return None
+
+
+async def _authenticate(request):
+    """Return ``(user, None)`` or ``(None, error_response)``."""
+    key = _token_key(request)
+    if not key:
+        return None, JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    try:
+        user, _ = await aauthenticate_credentials(key)
+    except AuthenticationFailed as exc:
+        return None, JsonResponse({"detail": str(exc.detail)}, status=401)
+    return user, None
+
+
+@csrf_exempt
+@require_POST
+async def send_message(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+
+    try:
+        data = json.loads(request.body or b"{}") if request.content_type == "application/json" else request.POST
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "Expected a JSON object"}, status=400)
+    message = data.get("message")
+    if not message:
+        return JsonResponse({"error": "Message is required"}, status=400)
+
+    cost = getattr(settings, "CHAT_MESSAGE_COST", 100)
+    if user.tokens < cost:
+        return JsonResponse({"error": "Insufficient tokens"}, status=400)
+
+    loop = asyncio.get_running_loop()
+    with span("predict"):
+        # run_in_executor does not copy contextvars; without this the request
+        # trace, and every span recorded inside predict_intent, is lost
+        context = contextvars.copy_context()
+        predicted_intent = await loop.run_in_executor(
+            get_inference_executor(), context.run, predict_intent, message)
+    response_text = f"Predicted intent: {predicted_intent}"
+
+    # The debit and the Chat insert must share a transaction, which the async
+    # ORM cannot express, so they run as one hop through charge_message. The
+    # thread-sensitive executor already runs these writes one at a time.
+    remaining_tokens = await sync_to_async(charge_message)(user, message, response_text, cost)
+    if remaining_tokens is None:
+        return JsonResponse({"error": "Insufficient tokens"}, status=400)
+
+    broker.publish(user.pk, "reply", {
+        "message": message,
+        "response": response_text,
+        "predicted_intent": predicted_intent,
+    })
+    broker.publish(user.pk, "balance", {"tokens": remaining_tokens})
+
+    return JsonResponse({
+        "message": message,
+        "response": response_text,
+        "predicted_intent": predicted_intent,
+        "remaining_tokens": remaining_tokens,
+    })
+
+
+@require_GET
+async def balance(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    return JsonResponse({"tokens": user.tokens})
+
+
+@require_GET
+async def details(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    return JsonResponse({"username": user.username, "tokens": user.tokens})
+
+
+# --- EVENT STREAM ---
+@csrf_exempt
+@require_POST
+async def event_ticket(request):
+    """A single-use ticket for opening ``/api/events/?ticket=<ticket>``."""
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    return JsonResponse({
+        "ticket": issue_ticket(user.pk),
+        "expires_in": getattr(settings, "EVENT_STREAM_TICKET_TTL", 30),
+    })
+
+
+async def _stream_user(request):
+    """Authenticate with ``Authorization: Token <key>`` or a ``?ticket=`` from ``event_ticket``."""
+    ticket = request.GET.get("ticket")
+    if not ticket:
+        return await _authenticate(request)
+    user_id = await aredeem_ticket(ticket)
+    user = user_id and await User.objects.filter(pk=user_id, is_active=True).afirst()
+    if not user:
+        return None, JsonResponse({"detail": "Invalid or expired ticket."}, status=401)
+    return user, None
+
+
+@require_GET
+async def event_stream(request):
+    """Server-sent events pushing ``reply`` and ``balance`` updates to the user.
+
+    Browsers' EventSource cannot set headers, so they first POST to
+    ``/api/events/ticket/`` and open the stream with the single-use ticket;
+    the long-lived API token never appears in a URL. Serve it under ASGI:
+    under WSGI every open stream holds a worker thread.
+    """
+    user, error = await _stream_user(request)
+    if error:
+        return error
+
+    keepalive = getattr(settings, "EVENT_STREAM_KEEPALIVE", 15)
+
+    async def stream():
+        subscription = broker.subscribe(user.pk)
+        try:
+            yield format_sse("balance", {"tokens": user.tokens})
+            while True:
+                event = await subscription.get(timeout=keepalive)
+                yield ": keepalive\n\n" if event is None else format_sse(*event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
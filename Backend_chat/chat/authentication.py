@@ -0,0 +1,71 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from . import user_cache
+from .instrumentation import span
+from .models import User
+
+
+def _user_from_cache(key, user_id, profile, balance):
+    if profile is None or balance is None or not profile["is_active"]:
+        return None
+    cached = {"id": user_id, "username": profile["username"], "is_active": True, "tokens": balance}
+    # Every other field is deferred: reading one loads it from the database,
+    # and save() only writes the cached fields, never a blank password or is_staff.
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in cached]
+    user = User.from_db("default", names, [cached[name] for name in names])
+    return user, Token(key=key, user_id=user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that resolves token -> user from the cache when it can.
+
+    On a hit the user is rebuilt from cached fields (id, username, is_active,
+    tokens) without touching the database. The other fields are deferred, so
+    reading one costs a query.
+    """
+
+    def authenticate_credentials(self, key):
+        with span("auth"):
+            return self._authenticate_credentials(key)
+
+    def _authenticate_credentials(self, key):
+        if user_cache.enabled():
+            user_id = user_cache.get_user_id(key)
+            if user_id is not None:
+                cached = _user_from_cache(key, user_id, *user_cache.get_user_state(user_id))
+                if cached is not None:
+                    return cached
+
+        user, token = super().authenticate_credentials(key)
+        if user_cache.enabled():
+            user_cache.remember(key, user)
+        return user, token
+
+
+async def aauthenticate_credentials(key):
+    """Async counterpart of ``CachedTokenAuthentication.authenticate_credentials``."""
+    with span("auth"):
+        return await _aauthenticate_credentials(key)
+
+
+async def _aauthenticate_credentials(key):
+    if user_cache.enabled():
+        user_id = await user_cache.aget_user_id(key)
+        if user_id is not None:
+            cached = _user_from_cache(key, user_id, *await user_cache.aget_user_state(user_id))
+            if cached is not None:
+                return cached
+
+    try:
+        token = await Token.objects.select_related("user").aget(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed(_("Invalid token."))
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+    if user_cache.enabled():
+        await user_cache.aremember(key, token.user)
+    return token.user, token
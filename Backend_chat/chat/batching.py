@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+from .inference_pool import predict_labels
+from .metrics import histogram
+
+
+# --- MICRO-BATCHING ---
+class _Pending:
+    __slots__ = ("item", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Collect items submitted from many threads and process them in batches.
+
+    A batch is closed when it holds ``max_batch_size`` items or when
+    ``max_wait`` seconds have passed since its first item arrived. ``handler``
+    receives the list of items and must return one result per item; if it
+    raises, every caller in the batch gets the exception.
+    """
+
+    def __init__(self, handler, max_batch_size=64, max_wait=0.002, name="batch"):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batch_size = histogram(
+            f"{name}_batch_size", "Items per processed batch.",
+            (1, 2, 4, 8, 16, 32, 64, 128, 256),
+        )
+        self.queue_wait = histogram(
+            f"{name}_queue_wait_seconds", "Time an item waited before its batch started.",
+            (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+        )
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item, timeout=None):
+        """Queue ``item`` and block until its batch has been processed."""
+        self._ensure_started()
+        pending = _Pending(item)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("Batch was not processed in time")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    thread.start()
+                    self._thread = thread
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self.batch_size.observe(len(batch))
+            for pending in batch:
+                self.queue_wait.observe(started - pending.enqueued_at)
+            try:
+                results = self.handler([pending.item for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as exc:
+                for pending in batch:
+                    pending.error = exc
+            for pending in batch:
+                pending.done.set()
+
+
+# --- INTENT BATCHER ---
+_intent_batcher = None
+_intent_batcher_lock = threading.Lock()
+
+
+def _predict_batch(messages):
+    # One vectorizer.transform and one forward pass for the whole batch
+    version, labels = predict_labels(messages)
+    return [(version, label) for label in labels]
+
+
+def get_intent_batcher():
+    global _intent_batcher
+    if _intent_batcher is None:
+        with _intent_batcher_lock:
+            if _intent_batcher is None:
+                _intent_batcher = MicroBatcher(
+                    _predict_batch,
+                    max_batch_size=getattr(settings, "INTENT_BATCH_MAX_SIZE", 64),
+                    max_wait=getattr(settings, "INTENT_BATCH_MAX_WAIT_MS", 2) / 1000,
+                    name="intent",
+                )
+    return _intent_batcher
@@ -0,0 +1,215 @@
+import asyncio
+import csv
+import io
+import resource
+import sys
+import threading
+from types import SimpleNamespace
+
+from .intent_model import CSV_PATH
+
+
+# --- HELPERS SHARED BY THE bench_* MANAGEMENT COMMANDS ---
+def current_rss_mb():
+    """Resident set size of this process right now (Linux), else the peak."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def process_memory_mb(pid):
+    """``(rss, pss)`` of a process in MB from /proc (Linux); PSS splits shared pages."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0]) / 1024
+    return values.get("Rss", 0.0), values.get("Pss", 0.0)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples`` keyed as ``p50``, ``p95``, ..."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in points}
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+        for p in points
+    }
+
+
+def training_patterns(csv_path=CSV_PATH):
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        return [row["pattern"] for row in csv.DictReader(f) if row.get("pattern")]
+
+
+class QueryCounter:
+    """Count SQL queries on every connection, in any thread, while installed.
+
+    Django opens a new connection per request (and ASGI runs sync views in
+    another thread), so the wrapper is attached whenever a connection is
+    created rather than to the current thread's connection only.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _attach(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(self._attach, weak=False)
+        for conn in connections.all():
+            self._attach(connection=conn)
+        return self
+
+    def uninstall(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.disconnect(self._attach)
+        for conn in connections.all():
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+
+# --- HAND LANDMARKS ---
+def landmark_objects(points):
+    """A (21, 3) array as a MediaPipe-like ``NormalizedLandmarkList`` (``.landmark[i].x/y/z``)."""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()])
+
+
+def legacy_hand_stats(hand_landmarks):
+    """``(raised finger names, gesture)`` computed attribute by attribute, as chatbot.py used to.
+
+    The reference that chat.landmarks is checked and benchmarked against.
+    """
+    finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky tips
+    thumb_tip = 4
+    finger_names = ["Index", "Middle", "Ring", "Pinky"]
+
+    fingers_up = sum(hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y for tip in finger_tips)
+    thumb_up = hand_landmarks.landmark[thumb_tip].y < hand_landmarks.landmark[thumb_tip - 1].y
+    if thumb_up:
+        fingers_up += 1
+
+    raised_fingers = [finger_names[i] for i, tip in enumerate(finger_tips) if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y]
+    if hand_landmarks.landmark[thumb_tip].y < hand_landmarks.landmark[thumb_tip - 1].y:
+        raised_fingers.append("Thumb")
+
+    gesture = "No Gesture"
+    if fingers_up == 1 and thumb_up:
+        gesture = "👍 Like"
+    elif fingers_up == 1 and not thumb_up:
+        gesture = "👎 Dislike"
+    elif fingers_up == 2 and not thumb_up:
+        gesture = "👉 Pointing"
+    elif fingers_up == 2 and thumb_up and hand_landmarks.landmark[16].y > hand_landmarks.landmark[14].y:
+        gesture = "🤘 Rock On"
+    elif fingers_up == 2 and thumb_up and hand_landmarks.landmark[20].y > hand_landmarks.landmark[18].y:
+        gesture = "🤙 Call Me"
+    elif fingers_up == 4:
+        gesture = "👌 OK"
+    elif fingers_up == 5:
+        gesture = "✋ Stop"
+    return raised_fingers, gesture
+
+
+# --- IN-PROCESS HTTP CLIENTS ---
+async def asgi_request(app, method, path, headers=(), body=b""):
+    """Call an ASGI app directly and return ``(status, body)``."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"content-length", str(len(body)).encode())]
+        + [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    request_sent = False
+    response = {"status": None, "body": []}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Nothing more to send: wait until the server stops listening
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+
+def wsgi_request(app, method, path, headers=(), body=b""):
+    """Call a WSGI app directly and return ``(status, body)``."""
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers:
+        key = name.upper().replace("-", "_")
+        environ[key if key in ("CONTENT_TYPE",) else f"HTTP_{key}"] = value
+    status = []
+
+    def start_response(status_line, response_headers, exc_info=None):
+        status.append(int(status_line.split()[0]))
+
+    result = app(environ, start_response)
+    try:
+        content = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return status[0], content
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .instrumentation import span
+from .metrics import counter
+from .models import Chat
+
+logger = logging.getLogger(__name__)
+
+
+# --- WRITE-BEHIND CHAT PERSISTENCE ---
+class ChatWriter:
+    """Buffer Chat rows in memory and persist them in batches with ``bulk_create``.
+
+    The queue is bounded by ``max_pending`` so at most that many rows can be
+    lost if the process crashes; when it is full ``record`` blocks the caller
+    (back-pressure) rather than dropping rows, so call it outside any
+    transaction (``save_chat`` defers it with ``on_commit``). A flush happens
+    every ``batch_size`` rows or ``flush_interval`` seconds, whichever comes
+    first, and on interpreter exit. A batch that fails to insert is retried
+    ``retries`` times with backoff; rows that still fail are logged and
+    counted in ``chat_write_behind_failed_rows_total``.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=0.5, max_pending=10000, retries=5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.failed_rows = counter(
+            "chat_write_behind_failed_rows_total", "Buffered chat rows given up on after every retry failed.",
+        )
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, user_id, message, response):
+        self._queue.put(Chat(user_id=user_id, message=message, response=response))
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    Chat.objects.bulk_create(batch)
+                    return
+                except Exception:
+                    if attempt == self.retries:
+                        logger.exception("Giving up on %d buffered chat rows", len(batch))
+                        self.failed_rows.inc(len(batch))
+                        return
+                    logger.warning("Persisting %d buffered chat rows failed; retrying", len(batch), exc_info=True)
+                    close_old_connections()
+                    time.sleep(min(0.1 * 2 ** attempt, 5.0))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            close_old_connections()
+            self._write(batch)
+
+    def flush(self):
+        """Block until every row recorded so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join()
+        # Write whatever arrived after the flusher's last pass
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            self._write(batch)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_chat_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ChatWriter(
+                    batch_size=getattr(settings, "CHAT_WRITE_BEHIND_BATCH_SIZE", 500),
+                    flush_interval=getattr(settings, "CHAT_WRITE_BEHIND_FLUSH_INTERVAL", 0.5),
+                    max_pending=getattr(settings, "CHAT_WRITE_BEHIND_MAX_PENDING", 10000),
+                )
+    return _writer
+
+
+def save_chat(user, message, response):
+    """Persist a chat exchange, through the write-behind buffer when enabled."""
+    with span("chat_insert"):
+        if getattr(settings, "CHAT_WRITE_BEHIND", False):
+            # Queue only once the debit has committed: a full queue must not block
+            # while this request holds the write lock, and a rollback queues nothing
+            writer, user_id = get_chat_writer(), user.pk
+            transaction.on_commit(lambda: writer.record(user_id, message, response))
+        else:
+            Chat.objects.create(user=user, message=message, response=response)
@@ -0,0 +1,214 @@
+import math
+import threading
+import time
+from collections import deque
+
+# --- SMOOTHING ---
+class _LowPass:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def __call__(self, value, alpha):
+        self.value = value if self.value is None else alpha * value + (1 - alpha) * self.value
+        return self.value
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """The 1€ filter (Casiez et al., CHI 2012) for one coordinate.
+
+    A low-pass filter whose cutoff rises with speed: slow movements get
+    ``min_cutoff`` Hz and lose their jitter, fast ones get up to
+    ``min_cutoff + beta * |speed|`` and keep up with the hand.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = _LowPass()
+        self._dx = _LowPass()
+        self._t = None
+
+    def __call__(self, value, t):
+        if self._t is None:
+            self._t = t
+            self._dx.value = 0.0
+            return self._x(value, 1.0)
+        dt = t - self._t
+        if dt <= 0:
+            return self._x.value
+        self._t = t
+        speed = self._dx((value - self._x.value) / dt, _alpha(self.d_cutoff, dt))
+        cutoff = self.min_cutoff + self.beta * abs(speed)
+        return self._x(value, _alpha(cutoff, dt))
+
+
+# --- CLICKS ---
+class ClickDetector:
+    """Turn thumb-index distances into click / double-click events.
+
+    open -> pending when the distance drops below ``press``; pending ->
+    pinched (a click) once it has stayed under ``release`` for ``debounce``
+    seconds and is below ``press`` again; back to open only above
+    ``release``. The gap between the two thresholds absorbs landmark jitter,
+    so a pinch clicks exactly once. A pinch within ``double_click`` seconds of
+    the previous click is a double click.
+    """
+
+    def __init__(self, press=0.05, release=0.07, debounce=0.03, double_click=0.3):
+        self.press = press
+        self.release = release
+        self.debounce = debounce
+        self.double_click = double_click
+        self.state = "open"
+        self._pending_since = None
+        self._last_click = float("-inf")
+
+    def update(self, distance, t):
+        """Feed one measurement; returns "click", "double_click" or None."""
+        if distance > self.release:
+            self.state = "open"
+            return None
+        if self.state == "open" and distance < self.press:
+            self.state, self._pending_since = "pending", t
+        if self.state != "pending" or distance >= self.press or t - self._pending_since < self.debounce:
+            return None
+        self.state = "pinched"
+        event = "double_click" if t - self._last_click < self.double_click else "click"
+        # A double click ends the sequence, so a third pinch is a fresh click
+        self._last_click = float("-inf") if event == "double_click" else t
+        return event
+
+
+# --- BACKENDS ---
+class PyAutoGUIBackend:
+    """Drive the real cursor. pyautogui's PAUSE sleep after every call is turned off."""
+
+    def __init__(self):
+        import pyautogui
+
+        pyautogui.PAUSE = 0
+        self.pyautogui = pyautogui
+
+    def size(self):
+        return tuple(self.pyautogui.size())
+
+    def move(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self):
+        self.pyautogui.click(_pause=False)
+
+    def double_click(self):
+        self.pyautogui.doubleClick(_pause=False)
+
+
+class RecordingBackend:
+    """Record what would have been done, with timestamps; for tests and benchmarks."""
+
+    def __init__(self, width=1920, height=1080):
+        self.width = width
+        self.height = height
+        self.calls = []
+
+    def size(self):
+        return self.width, self.height
+
+    def move(self, x, y):
+        self.calls.append((time.perf_counter(), "move", x, y))
+
+    def click(self):
+        self.calls.append((time.perf_counter(), "click"))
+
+    def double_click(self):
+        self.calls.append((time.perf_counter(), "double_click"))
+
+
+# --- ACTUATOR ---
+class CursorActuator:
+    """Move the cursor from its own thread, at most ``rate`` times per second.
+
+    ``update(x, y, pinch)`` takes the index fingertip in frame-relative
+    coordinates and the thumb-index distance and returns at once. Positions
+    are coalesced (only the newest is used), smoothed with a 1€ filter per
+    axis and skipped when they would move the cursor by less than
+    ``min_step`` pixels. Clicks are detected on every update, so none are
+    lost to coalescing, and are performed in order on the actuator thread.
+    ``latency_ms`` holds update-to-move delays of recent moves.
+    """
+
+    def __init__(self, backend, rate=120, min_cutoff=1.0, beta=0.02, min_step=1, clicks=None):
+        self.backend = backend
+        self.interval = 1.0 / rate
+        self.min_step = min_step
+        self.clicks = clicks or ClickDetector()
+        self.width, self.height = backend.size()
+        self.latency_ms = deque(maxlen=1000)
+        self.moves = 0
+        self._filters = (OneEuroFilter(min_cutoff, beta), OneEuroFilter(min_cutoff, beta))
+        self._target = None
+        self._events = deque()
+        self._position = None
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="cursor-actuator", daemon=True)
+        self._thread.start()
+
+    def update(self, x, y, pinch=None, t=None):
+        t = time.perf_counter() if t is None else t
+        event = self.clicks.update(pinch, t) if pinch is not None else None
+        with self._wake:
+            self._target = (x * self.width, y * self.height, t, time.perf_counter())
+            if event:
+                self._events.append(event)
+            self._wake.notify()
+        return event
+
+    def _run(self):
+        next_move = 0.0
+        while True:
+            with self._wake:
+                self._wake.wait_for(lambda: self._stopping or self._target is not None or self._events)
+                if self._stopping:
+                    return
+                events, self._events = self._events, deque()
+                # Hold back the move until the rate limit allows it, but never a click
+                target = self._target if time.perf_counter() >= next_move else None
+                if target is not None:
+                    self._target = None
+            if target is not None:
+                next_move = time.perf_counter() + self.interval
+                self._move(target)
+            for event in events:
+                if event == "double_click":
+                    self.backend.double_click()
+                else:
+                    self.backend.click()
+            if target is None and not events:
+                time.sleep(max(next_move - time.perf_counter(), 0))
+
+    def _move(self, target):
+        x, y, t, received = target
+        x = self._filters[0](x, t)
+        y = self._filters[1](y, t)
+        position = (round(x), round(y))
+        if self._position is not None and max(abs(position[0] - self._position[0]),
+                                              abs(position[1] - self._position[1])) < self.min_step:
+            return
+        self.backend.move(*position)
+        self._position = position
+        self.moves += 1
+        self.latency_ms.append((time.perf_counter() - received) * 1000)
+
+    def stop(self):
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        self._thread.join()
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+# --- CONNECTION SETUP ---
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Run the SQLITE_PRAGMAS setting on each new SQLite connection.
+
+    Executed on the raw sqlite3 connection so the pragmas do not show up in
+    query counts or instrumentation.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import namedtuple
+
+# --- FACE BOXES ---
+# Boxes are MediaPipe's relative bounding boxes: (xmin, ymin, width, height)
+# as fractions of the frame size.
+
+Mood = namedtuple("Mood", "label timestamp box latency")
+
+
+def face_boxes(face_result):
+    """Relative boxes from a MediaPipe FaceDetection result, largest first."""
+    boxes = []
+    for detection in face_result.detections or ():
+        box = detection.location_data.relative_bounding_box
+        boxes.append((box.xmin, box.ymin, box.width, box.height))
+    return sorted(boxes, key=lambda b: b[2] * b[3], reverse=True)
+
+
+def crop_face(frame, box, margin=0.2):
+    """A copy of the face region of ``frame``, grown by ``margin`` on each side and clipped."""
+    height, width = frame.shape[:2]
+    x, y, w, h = box
+    left = max(int((x - w * margin) * width), 0)
+    top = max(int((y - h * margin) * height), 0)
+    right = min(int((x + w * (1 + margin)) * width), width)
+    bottom = min(int((y + h * (1 + margin)) * height), height)
+    if right <= left or bottom <= top:
+        return None
+    return frame[top:bottom, left:right].copy()
+
+
+def box_shift(a, b):
+    """How much a face box moved or resized: ``1 - IoU``, so 0 is identical and 1 is disjoint."""
+    if a is None or b is None:
+        return 1.0
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    overlap = max(right - left, 0) * max(bottom - top, 0)
+    union = a[2] * a[3] + b[2] * b[3] - overlap
+    return 1.0 - overlap / union if union > 0 else 1.0
+
+
+def deepface_emotion(face):
+    """Dominant emotion of an already cropped face with DeepFace."""
+    from deepface import DeepFace
+
+    # The crop is the face, so skip DeepFace's own detector
+    analysis = DeepFace.analyze(face, actions=["emotion"], enforce_detection=False, detector_backend="skip")
+    return analysis[0]["dominant_emotion"] if analysis else None
+
+
+# --- BACKGROUND WORKER ---
+class EmotionWorker:
+    """Run emotion analysis on face crops in a background thread.
+
+    The capture loop calls ``submit(frame, boxes)`` every frame; it only crops
+    and hands over the largest face when the worker is idle and either
+    ``1 / rate`` seconds have passed since the last analysis or the face box
+    moved by more than ``min_shift`` (see ``box_shift``). Everything else is
+    dropped, so the loop never waits for the model. The newest result is
+    published as ``mood``, stamped with ``time.monotonic()``.
+    """
+
+    def __init__(self, analyze=deepface_emotion, rate=3.0, min_shift=0.3, margin=0.2):
+        self.analyze = analyze
+        self.interval = 1.0 / rate if rate else 0.0
+        self.min_shift = min_shift
+        self.margin = margin
+        self.mood = None
+        self.analyzed = 0
+        self.errors = 0
+        self._job = None
+        self._busy = False
+        self._last_submit = float("-inf")
+        self._last_box = None
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="emotion-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, boxes, now=None):
+        """Offer a frame and its face boxes; returns True if it was queued for analysis."""
+        if not boxes:
+            return False
+        now = time.monotonic() if now is None else now
+        box = boxes[0]
+        due = now - self._last_submit >= self.interval
+        moved = self.min_shift is not None and box_shift(box, self._last_box) > self.min_shift
+        if self._busy or not (due or moved):
+            return False
+        face = crop_face(frame, box, self.margin)
+        if face is None:
+            return False
+        with self._wake:
+            self._job = (face, box, time.monotonic())
+            self._busy = True
+            self._wake.notify()
+        self._last_submit, self._last_box = now, box
+        return True
+
+    def current(self, max_age=2.0, default="Unknown"):
+        """The latest mood label, or ``default`` when there is none newer than ``max_age`` seconds."""
+        mood = self.mood
+        if mood is None or mood.label is None or time.monotonic() - mood.timestamp > max_age:
+            return default
+        return mood.label
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while self._job is None and not self._stopping:
+                    self._wake.wait()
+                if self._stopping:
+                    return
+                face, box, submitted = self._job
+                self._job = None
+            try:
+                label = self.analyze(face)
+                self.mood = Mood(label, time.monotonic(), box, time.monotonic() - submitted)
+                self.analyzed += 1
+            except Exception:
+                self.errors += 1
+            finally:
+                self._busy = False
+
+    def stop(self):
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        self._thread.join()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import secrets
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+
+# --- IN-MEMORY PUB/SUB FOR STREAMED EVENTS ---
+class Subscription:
+    """One connected client's event queue, bound to the event loop that created it."""
+
+    def __init__(self, broker, user_id, maxsize):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, event):
+        # Runs on the subscriber's loop. A slow client loses its oldest
+        # events rather than growing the queue without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """The next event, or None if ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Fan out per-user events from any thread to subscribers on event loops.
+
+    Idle subscribers cost one small queue each, so a single ASGI process can
+    hold many thousands of them.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, maxsize=100):
+        """Register a subscriber; must be called from inside a running event loop."""
+        subscription = Subscription(self, user_id, maxsize)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event, data):
+        """Send ``event`` to every subscriber of ``user_id``; safe to call from sync code."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        payload = (event, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, payload)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+broker = EventBroker()
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# --- STREAM TICKETS ---
+# Browsers' EventSource cannot set headers, so the stream URL carries a
+# ticket instead of the API token: signed, valid for EVENT_STREAM_TICKET_TTL
+# seconds and accepted once, so one leaked through an access log is useless.
+# "Once" is enforced in the default cache, per worker unless it is shared.
+_TICKET_SALT = "chat.events.ticket"
+
+
+def issue_ticket(user_id):
+    return signing.TimestampSigner(salt=_TICKET_SALT).sign(f"{user_id}:{secrets.token_urlsafe(16)}")
+
+
+async def aredeem_ticket(ticket):
+    """The ticket's user id, or None if it is forged, expired or already used."""
+    ttl = getattr(settings, "EVENT_STREAM_TICKET_TTL", 30)
+    try:
+        value = signing.TimestampSigner(salt=_TICKET_SALT).unsign(ticket, max_age=ttl)
+    except signing.BadSignature:
+        return None
+    user_id, nonce = value.split(":", 1)
+    # add() only succeeds for the first redemption
+    if not await cache.aadd(f"sse-ticket:{nonce}", True, ttl):
+        return None
+    return int(user_id)
@@ -0,0 +1,124 @@
+import numpy as np
+
+
+# --- NUMPY INFERENCE ENGINE ---
+# The intent network is a small stack of Dense layers, so serving it does not
+# need TensorFlow: the forward pass is a sparse (CSR) x dense product for the
+# first layer followed by a couple of tiny dense matmuls.
+
+def relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+class DenseNetwork:
+    """Forward pass of a Keras ``Sequential`` of Dense(relu)... Dense(softmax) layers.
+
+    ``weights`` is the list returned by ``model.get_weights()``:
+    ``[kernel_0, bias_0, kernel_1, bias_1, ...]``.
+    """
+
+    def __init__(self, weights, dtype=np.float32):
+        self.layers = [
+            (np.ascontiguousarray(weights[i], dtype=dtype), np.asarray(weights[i + 1], dtype=dtype))
+            for i in range(0, len(weights), 2)
+        ]
+
+    @property
+    def n_features(self):
+        return self.layers[0][0].shape[0]
+
+    def predict_proba(self, features):
+        """Class probabilities for a batch of feature rows.
+
+        ``features`` may be a SciPy sparse matrix (the output of
+        ``vectorizer.transform``) or a dense array; it is never densified.
+        """
+        hidden = features
+        last = len(self.layers) - 1
+        for i, (kernel, bias) in enumerate(self.layers):
+            hidden = np.asarray(hidden @ kernel)
+            hidden += bias
+            if i < last:
+                relu(hidden)
+        return softmax(hidden)
+
+    def predict(self, features):
+        return np.argmax(self.predict_proba(features), axis=1)
+
+
+# --- QUANTIZED WEIGHTS ---
+def quantize_kernel(kernel, dtype="int8"):
+    """Compress a float kernel to ``int8`` (symmetric, one scale per output unit) or ``float16``.
+
+    Returns ``(quantized, scales)``; ``scales`` is None for float16.
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    if dtype == "float16":
+        return kernel.astype(np.float16), None
+    if dtype != "int8":
+        raise ValueError(f"Unsupported quantization dtype {dtype!r}")
+    scales = np.abs(kernel).max(axis=0) / 127
+    scales[scales == 0] = 1
+    quantized = np.clip(np.rint(kernel / scales), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_kernel(kernel, scales=None):
+    kernel = kernel.astype(np.float32)
+    if scales is not None:
+        kernel *= scales
+    return kernel
+
+
+class QuantizedDenseNetwork(DenseNetwork):
+    """``DenseNetwork`` over an int8/float16 first-layer kernel.
+
+    The first kernel (vocabulary x 16) holds nearly all the parameters and is
+    kept compressed: the forward pass gathers only the rows of the features
+    present in the batch and dequantizes those. The small later layers are
+    dequantized once here.
+    """
+
+    def __init__(self, weights, scales=None, dtype=np.float32):
+        scales = scales or [None] * (len(weights) // 2)
+        self.scales = scales[0]
+        self.layers = [(np.ascontiguousarray(weights[0]), np.asarray(weights[1], dtype=dtype))] + [
+            (dequantize_kernel(weights[i], scales[i // 2]), np.asarray(weights[i + 1], dtype=dtype))
+            for i in range(2, len(weights), 2)
+        ]
+
+    def _first_layer(self, features):
+        kernel = self.layers[0][0]
+        if not hasattr(features, "indptr"):
+            hidden = np.asarray(features, dtype=np.float32) @ dequantize_kernel(kernel)
+        elif features.nnz >= kernel.shape[0]:
+            # Big batches touch most rows anyway; SciPy upcasts the kernel once
+            hidden = np.asarray(features @ kernel, dtype=np.float32)
+        else:
+            # Gather the rows of the terms present and contract them with a
+            # (messages x nnz) selector carrying the TF-IDF values
+            from scipy.sparse import csr_matrix
+
+            features = features.tocsr()
+            selector = csr_matrix((features.data, np.arange(features.nnz), features.indptr),
+                                  shape=(features.shape[0], features.nnz))
+            hidden = np.asarray(selector @ kernel[features.indices].astype(np.float32))
+        if self.scales is not None:
+            hidden *= self.scales
+        return hidden
+
+    def predict_proba(self, features):
+        hidden = self._first_layer(features)
+        hidden += self.layers[0][1]
+        for kernel, bias in self.layers[1:]:
+            relu(hidden)
+            hidden = hidden @ kernel
+            hidden += bias
+        return softmax(hidden)
@@ -0,0 +1,394 @@
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from collections.abc import Mapping
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener, wait
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from django.conf import settings
+
+from .intent_cache import normalize
+from .intent_model import ModelHolder, get_bundle
+
+logger = logging.getLogger(__name__)
+
+
+# --- SHARED WEIGHTS ---
+class SharedArrays:
+    """Copy a list of arrays into one shared-memory block and view them from there.
+
+    Forked pool workers inherit the mapping, so the vocabulary, IDF vector
+    and weights exist once in physical memory however many workers there are.
+    """
+
+    def __init__(self, arrays):
+        arrays = [np.ascontiguousarray(a) for a in arrays]
+        self.shm = SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays)))
+        self.arrays, offset = [], 0
+        for array in arrays:
+            view = np.ndarray(array.shape, array.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = array
+            view.flags.writeable = False
+            self.arrays.append(view)
+            offset += array.nbytes
+
+    def close(self):
+        self.arrays = []
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedVocabulary(Mapping):
+    """A read-only term -> column mapping stored as flat arrays instead of a dict.
+
+    Terms are sorted by ``hash()``: a lookup binary-searches the hash and
+    confirms the match against the term's UTF-8 bytes. ``hash()`` is salted
+    per interpreter, so the arrays are only valid in the process that built
+    them and the workers it forks.
+    """
+
+    def __init__(self, hashes, columns, offsets, blob):
+        self.hashes = hashes
+        self.columns = columns
+        self.offsets = offsets
+        self.blob = blob
+
+    @staticmethod
+    def arrays(vocabulary):
+        """``[hashes, columns, offsets, blob]`` for ``vocabulary``, ready for ``SharedArrays``."""
+        terms = sorted(vocabulary, key=hash)
+        encoded = [term.encode("utf-8") for term in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(term) for term in encoded], out=offsets[1:])
+        return [
+            np.array([hash(term) for term in terms], dtype=np.int64),
+            np.array([vocabulary[term] for term in terms], dtype=np.int32),
+            offsets,
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        ]
+
+    def _term_bytes(self, slot):
+        return self.blob[self.offsets[slot]:self.offsets[slot + 1]].tobytes()
+
+    def _find(self, term, term_hash, slot):
+        encoded = term.encode("utf-8")
+        while slot < len(self.hashes) and self.hashes[slot] == term_hash:
+            if self._term_bytes(slot) == encoded:
+                return int(self.columns[slot])
+            slot += 1
+        return None
+
+    def lookup(self, terms):
+        """``(positions, columns)`` of the in-vocabulary entries of ``terms``."""
+        hashes = np.fromiter(map(hash, terms), dtype=np.int64, count=len(terms))
+        slots = np.searchsorted(self.hashes, hashes)
+        positions = np.flatnonzero(self.hashes[np.minimum(slots, len(self.hashes) - 1)] == hashes)
+        slots = slots[positions]
+        columns = self.columns[slots]
+        # A matching hash is almost always the term itself; confirm against its bytes
+        blob = memoryview(self.blob)
+        keep = np.ones(len(positions), dtype=bool)
+        for i, (position, start, end) in enumerate(zip(
+            positions.tolist(), self.offsets[slots].tolist(), self.offsets[slots + 1].tolist()
+        )):
+            if blob[start:end] != terms[position].encode("utf-8"):
+                column = self._find(terms[position], int(hashes[position]), int(slots[i]) + 1)
+                keep[i] = column is not None
+                columns[i] = column or 0
+        return positions[keep], columns[keep]
+
+    def __getitem__(self, term):
+        term_hash = hash(term)
+        column = self._find(term, term_hash, int(np.searchsorted(self.hashes, term_hash)))
+        if column is None:
+            raise KeyError(term)
+        return column
+
+    def __iter__(self):
+        return (self._term_bytes(slot).decode("utf-8") for slot in range(len(self.hashes)))
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+class SharedVectorizer:
+    """``TfidfVectorizer.transform`` (default settings) over a ``SharedVocabulary``.
+
+    sklearn copies any vocabulary it is given into a dict, so the pool
+    tokenizes with the same pattern as ``intent_cache.normalize``, counts,
+    weights by the IDF vector and L2-normalizes rows itself.
+    """
+
+    def __init__(self, vocabulary, idf):
+        # Imported here, in the pool parent, so forked workers share the modules
+        from scipy.sparse import csr_matrix
+        from sklearn.preprocessing import normalize as l2_normalize
+
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self._csr_matrix = csr_matrix
+        self._l2_normalize = l2_normalize
+
+    def transform(self, messages):
+        terms, rows = [], []
+        for row, message in enumerate(messages):
+            tokens = normalize(message).split()
+            terms.extend(tokens)
+            rows.extend([row] * len(tokens))
+        positions, columns = self.vocabulary.lookup(terms)
+        rows = np.asarray(rows, dtype=np.int64)[positions]
+        counts = self._csr_matrix(
+            (np.ones(len(columns), dtype=np.float32), (rows, columns)), shape=(len(messages), len(self.idf)),
+        )
+        counts.sum_duplicates()
+        counts.data *= self.idf[counts.indices]
+        return self._l2_normalize(counts, copy=False)
+
+
+def share_bundle(bundle):
+    """Move a bundle's vocabulary, IDF vector and layer weights into shared memory.
+
+    Float weights are stored as float32; quantized (int8/float16) kernels keep their dtype.
+    """
+    weights = [w if w.dtype in (np.int8, np.float16) else np.asarray(w, dtype=np.float32)
+               for w in bundle.weights]
+    vocabulary = SharedVocabulary.arrays(bundle.vocabulary)
+    shared = SharedArrays(vocabulary + [bundle.idf.astype(np.float32)] + weights)
+    bundle.vocabulary = SharedVocabulary(*shared.arrays[:4])
+    bundle.idf, bundle.weights = shared.arrays[4], shared.arrays[5:]
+    bundle._vectorizer = SharedVectorizer(bundle.vocabulary, bundle.idf)
+    bundle._network = None
+    # Build the network now so workers inherit it ready-made
+    bundle.network
+    return shared
+
+
+# --- POOL SERVER ---
+def _serve(listener, bundle):
+    """Worker process loop: accept web-worker connections and answer requests."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # SIGTERM retires the worker after the request in hand (see InferencePool.reload)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    connections = []
+    lock = threading.Lock()
+
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            with lock:
+                connections.append(conn)
+
+    threading.Thread(target=accept, daemon=True).start()
+    while not stopping.is_set():
+        with lock:
+            current = list(connections)
+        for conn in wait(current, timeout=0.05) if current else ():
+            try:
+                op, payload = conn.recv()
+                if op == "predict":
+                    conn.send(("ok", bundle.version, bundle.predict(payload)))
+                elif op == "top_k":
+                    messages, k = payload
+                    conn.send(("ok", bundle.version, bundle.top_k(messages, k)))
+                elif op == "version":
+                    conn.send(("ok", bundle.version, None))
+                else:
+                    conn.send(("error", f"unknown op {op!r}", None))
+            except (EOFError, OSError):
+                with lock:
+                    connections.remove(conn)
+                conn.close()
+            except Exception as exc:
+                logger.exception("Inference pool request failed")
+                conn.send(("error", str(exc), None))
+        if not current:
+            stopping.wait(0.05)
+    with lock:
+        for conn in connections:
+            conn.close()
+
+
+class InferencePool:
+    """Load the model once, share its arrays and pre-fork ``workers`` server processes.
+
+    Requires the ``fork`` start method (Linux, macOS). All workers accept on
+    the same Unix socket, so the kernel spreads web-worker connections
+    across them. ``reload`` rolls the workers over to a newly published
+    bundle without closing the socket.
+    """
+
+    def __init__(self, address, workers=2, authkey=None, holder=None):
+        self.address = address
+        self.workers = workers
+        self.authkey = authkey or _authkey()
+        self.holder = holder or ModelHolder()
+        self.processes = []
+        self.shared = None
+        self.listener = None
+
+    @property
+    def version(self):
+        return self.holder.get().version
+
+    def start(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self.listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        self._spawn(self.holder.get())
+        return self
+
+    def _spawn(self, bundle):
+        """Fork a generation of workers serving ``bundle``; return the previous one."""
+        shared = share_bundle(bundle)
+        ctx = get_context("fork")
+        processes = []
+        for _ in range(self.workers):
+            process = ctx.Process(target=_serve, args=(self.listener, bundle), daemon=True)
+            process.start()
+            processes.append(process)
+        previous = (self.processes, self.shared)
+        self.processes, self.shared = processes, shared
+        return previous
+
+    @staticmethod
+    def _retire(processes, shared):
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        if shared is not None:
+            shared.close()
+
+    def reload(self):
+        """Roll over to a newly published bundle. Returns True if the workers were replaced.
+
+        The new generation is forked and accepting before the old one is told
+        to exit, and old workers finish the request they are serving; clients
+        reconnect transparently.
+        """
+        if self.listener is None or not self.holder.check():
+            return False
+        self._retire(*self._spawn(self.holder.get()))
+        logger.info("Inference pool now serving intent model %s", self.version)
+        return True
+
+    def stop(self):
+        self._retire(self.processes, self.shared)
+        self.processes, self.shared = [], None
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+
+# --- CLIENT (WEB WORKERS) ---
+def _authkey():
+    return getattr(settings, "SECRET_KEY", "").encode() or b"inference-pool"
+
+
+class PoolClient:
+    """Thread-safe client keeping a small stack of connections to the pool.
+
+    ``model_version`` asks the pool again once the last answer is
+    ``version_ttl`` seconds old, so a reload is noticed even by callers
+    that never miss the intent cache.
+    """
+
+    def __init__(self, address, authkey=None, version_ttl=1.0):
+        self.address = address
+        self.authkey = authkey or _authkey()
+        self.version_ttl = version_ttl
+        self._idle = queue.LifoQueue()
+        self.version = None
+        self._version_seen = 0.0
+
+    def _connect(self):
+        return Client(self.address, family="AF_UNIX", authkey=self.authkey)
+
+    def _call(self, op, payload=None):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            try:
+                conn.send((op, payload))
+                status, version, result = conn.recv()
+            except (EOFError, ConnectionError):
+                # The worker was retired by a reload; requests are idempotent, so retry once
+                conn.close()
+                conn = self._connect()
+                conn.send((op, payload))
+                status, version, result = conn.recv()
+        except Exception:
+            conn.close()
+            raise
+        self._idle.put(conn)
+        if status != "ok":
+            raise RuntimeError(f"Inference pool error: {version}")
+        self.version, self._version_seen = version, time.monotonic()
+        return version, result
+
+    def predict(self, messages):
+        """``(version, labels)``, so callers know which model produced them."""
+        return self._call("predict", list(messages))
+
+    def top_k(self, messages, k=3):
+        """``(version, results)``, so callers know which model produced them."""
+        return self._call("top_k", (list(messages), k))
+
+    def model_version(self):
+        if self.version is None or time.monotonic() - self._version_seen >= self.version_ttl:
+            self._call("version")
+        return self.version
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_pool_client():
+    """The pool client when INTENT_INFERENCE_POOL names a socket, else None."""
+    global _client
+    address = getattr(settings, "INTENT_INFERENCE_POOL", None)
+    if not address:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PoolClient(address, version_ttl=getattr(settings, "INTENT_POOL_VERSION_TTL", 1.0))
+    return _client
+
+
+def predict_labels(messages):
+    """``(model_version, intent labels)`` for ``messages`` from the inference pool, or the local bundle."""
+    client = get_pool_client()
+    if client is not None:
+        return client.predict(messages)
+    bundle = get_bundle()
+    return bundle.version, bundle.predict(messages)
+
+
+def predict_top_k(messages, k=3):
+    """``(model_version, top-k intents per message)`` from the pool or the local bundle."""
+    client = get_pool_client()
+    if client is not None:
+        return client.top_k(messages, k)
+    bundle = get_bundle()
+    return bundle.version, bundle.top_k(messages, k)
+
+
+def model_version():
+    """Version of the model that ``predict_labels`` is serving."""
+    client = get_pool_client()
+    if client is not None:
+        return client.model_version()
+    return get_bundle().version
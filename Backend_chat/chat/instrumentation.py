@@ -0,0 +1,183 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from .metrics import CONTENT_TYPE, histogram, render_prometheus
+
+# --- REQUEST TRACES ---
+# A trace is attached to the request's context only when the request is
+# sampled; everywhere else ``span`` and the query hook cost a ContextVar read.
+
+_current = ContextVar("request_trace", default=None)
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class RequestTrace:
+    __slots__ = ("stages", "db_queries", "db_time")
+
+    def __init__(self):
+        self.stages = {}
+        self.db_queries = 0
+        self.db_time = 0.0
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+class span:
+    """Time a stage of the current request: ``with span("debit"): ...``.
+
+    Repeated spans with the same name add up. Does nothing outside a sampled
+    request, so it is safe on hot paths and in background threads.
+    """
+
+    __slots__ = ("name", "trace", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = _current.get()
+        if self.trace is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace is not None:
+            self.trace.add(self.name, time.perf_counter() - self.started)
+
+
+# --- DATABASE HOOK ---
+def _record_query(execute, sql, params, many, context):
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.db_queries += 1
+        trace.db_time += time.perf_counter() - started
+
+
+def _attach(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_hook():
+    """Count queries of sampled requests on every connection, in any thread.
+
+    The trace travels in a ContextVar, which ``sync_to_async`` copies into
+    its worker thread, so queries made from async views are counted too.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_attach, dispatch_uid="chat.instrumentation")
+    for conn in connections.all(initialized_only=True):
+        _attach(connection=conn)
+
+
+# --- MIDDLEWARE ---
+class InstrumentationMiddleware:
+    """Record request latency for every request and a stage breakdown for sampled ones.
+
+    Sampled requests (REQUEST_INSTRUMENTATION_SAMPLE_RATE) get per-span and
+    database timings in ``Server-Timing`` and in the histograms served at
+    ``/metrics``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+        self.server_timing = getattr(settings, "REQUEST_INSTRUMENTATION_SERVER_TIMING", False)
+        self._series = {}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _histogram(self, name, help_text, buckets, **labels):
+        # Skip the registry's sorted label key on the per-request path
+        key = (name, *labels.values())
+        metric = self._series.get(key)
+        if metric is None:
+            metric = self._series[key] = histogram(name, help_text, buckets, labels)
+        return metric
+
+    def _begin(self):
+        trace = RequestTrace() if self.sample_rate >= 1 or random.random() < self.sample_rate else None
+        return trace, _current.set(trace), time.perf_counter()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trace, token, started = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, trace, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        trace, token, started = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, trace, time.perf_counter() - started)
+
+    def _finish(self, request, response, trace, elapsed):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unmatched"
+        self._histogram(
+            "http_request_duration_seconds", "Request latency until the response object is returned.",
+            LATENCY_BUCKETS, view=view, method=request.method, status=str(response.status_code),
+        ).observe(elapsed)
+        if trace is None:
+            return response
+
+        for stage, seconds in trace.stages.items():
+            self._histogram(
+                "http_request_stage_seconds", "Time spent in an instrumented stage of a sampled request.",
+                LATENCY_BUCKETS, view=view, stage=stage,
+            ).observe(seconds)
+        self._histogram(
+            "http_request_db_queries", "SQL queries per sampled request.", QUERY_BUCKETS, view=view,
+        ).observe(trace.db_queries)
+        self._histogram(
+            "http_request_db_seconds", "SQL time per sampled request.", LATENCY_BUCKETS, view=view,
+        ).observe(trace.db_time)
+
+        if self.server_timing:
+            timings = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in trace.stages.items()]
+            timings.append(f'db;dur={trace.db_time * 1000:.3f};desc="{trace.db_queries} queries"')
+            timings.append(f"total;dur={elapsed * 1000:.3f}")
+            response["Server-Timing"] = ", ".join(timings)
+        return response
+
+
+# --- /metrics ---
+def metrics_view(request):
+    """All in-process metrics in the Prometheus text format.
+
+    Off (404) unless METRICS_TOKEN is set; the scraper must then send
+    ``Authorization: Bearer <token>``.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        return HttpResponse(status=404)
+    if request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(render_prometheus(), content_type=CONTENT_TYPE)
@@ -0,0 +1,120 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import counter
+
+# TfidfVectorizer's default analysis: lowercase, then tokens of 2+ word characters.
+# Spelled out so web workers using the inference pool never import sklearn.
+_token_pattern = re.compile(r"(?u)\b\w\w+\b")
+
+
+def normalize(message):
+    """The message as the intent model sees it: its TF-IDF tokens joined by spaces.
+
+    Every intent model is built on ``TfidfVectorizer``'s default analyzer, so
+    messages that normalize to the same text have identical feature vectors
+    and therefore the same prediction. Case, punctuation between words and
+    extra whitespace are ignored; ``don't``/``dont`` or ``e-mail``/``email``
+    are not, because the analyzer splits them differently.
+    """
+    return " ".join(_token_pattern.findall(message.lower()))
+
+
+# --- INTENT RESPONSE CACHE ---
+class IntentCache:
+    """Bounded LRU + TTL cache of predicted intents keyed on (model version, normalized text).
+
+    Including the model version in the key means a new artifact never serves
+    predictions cached for the old one. ``shared`` is an optional Django cache
+    (e.g. Redis, or LocMemCache as a local stand-in) consulted on a local miss.
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600, shared=None, name="intent_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = counter(f"{name}_hits_total", "Intent cache hits.")
+        self.misses = counter(f"{name}_misses_total", "Intent cache misses.")
+        self.evictions = counter(f"{name}_evictions_total", "Intent cache LRU/TTL evictions.")
+
+    @staticmethod
+    def key(message, version):
+        digest = hashlib.sha1(normalize(message).encode("utf-8")).hexdigest()
+        return f"intent:{version}:{digest}"
+
+    def get(self, message, version):
+        key = self.key(message, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits.inc()
+                    return value
+                del self._entries[key]
+                self.evictions.inc()
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self._store(key, value, now)
+                self.hits.inc()
+                return value
+        self.misses.inc()
+        return None
+
+    def set(self, message, version, value):
+        key = self.key(message, version)
+        self._store(key, value, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    def _store(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "evictions": self.evictions.value,
+            "size": len(self._entries),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_intent_cache():
+    """The process-wide cache, or None when INTENT_CACHE is off."""
+    global _cache
+    if not getattr(settings, "INTENT_CACHE", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                alias = getattr(settings, "INTENT_CACHE_SHARED_BACKEND", None)
+                _cache = IntentCache(
+                    max_entries=getattr(settings, "INTENT_CACHE_MAX_ENTRIES", 10000),
+                    ttl=getattr(settings, "INTENT_CACHE_TTL", 3600),
+                    shared=caches[alias] if alias else None,
+                )
+    return _cache
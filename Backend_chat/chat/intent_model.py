@@ -0,0 +1,607 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+from django.conf import settings
+
+from .inference import DenseNetwork, QuantizedDenseNetwork
+from .instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "training_data.csv")
+LATEST_POINTER = "LATEST"
+
+
+# --- ARTIFACT BUNDLE ---
+class IntentBundle:
+    """A trained intent model: TF-IDF vocabulary, label classes and layer weights."""
+
+    def __init__(self, version, vocabulary, idf, classes, weights, meta=None,
+                 document_frequency=None, row_hashes=None, scales=None):
+        self.version = version
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf)
+        self.classes = list(classes)
+        self.weights = [np.asarray(w) for w in weights]
+        self.meta = meta or {}
+        # Kept so later incremental runs can extend the IDF and skip seen rows
+        self.document_frequency = None if document_frequency is None else np.asarray(document_frequency)
+        self.row_hashes = None if row_hashes is None else np.asarray(row_hashes, dtype=np.uint64)
+        # Per-unit kernel scales of an int8 export (see chat.quantization)
+        self.scales = None if scales is None else [np.asarray(s, dtype=np.float32) for s in scales]
+        self._vectorizer = None
+        self._network = None
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            vectorizer = TfidfVectorizer(vocabulary=self.vocabulary, dtype=np.float32)
+            vectorizer.idf_ = self.idf.astype(np.float32)
+            self._vectorizer = vectorizer
+        return self._vectorizer
+
+    @property
+    def network(self):
+        if self._network is None:
+            if self.quantized:
+                self._network = QuantizedDenseNetwork(self.weights, self.scales)
+            else:
+                self._network = DenseNetwork(self.weights)
+        return self._network
+
+    @property
+    def quantized(self):
+        return self.scales is not None or self.weights[0].dtype in (np.int8, np.float16)
+
+    def predict_proba(self, messages):
+        """Softmax outputs for a batch of messages, computed on the sparse TF-IDF rows."""
+        with span("vectorize"):
+            features = self.vectorizer.transform(messages)
+        with span("forward"):
+            return self.network.predict_proba(features)
+
+    def predict(self, messages):
+        """Return the predicted intent label for each message."""
+        return [self.classes[i] for i in np.argmax(self.predict_proba(messages), axis=1)]
+
+    def top_k(self, messages, k=3):
+        """The ``k`` most likely intents per message as ``[(intent, probability), ...]``."""
+        proba = self.predict_proba(messages)
+        k = max(1, min(k, proba.shape[1]))
+        best = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(-proba, best, axis=1).argsort(axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        scores = np.take_along_axis(proba, best, axis=1)
+        return [
+            [(self.classes[i], float(p)) for i, p in zip(row, row_scores)]
+            for row, row_scores in zip(best.tolist(), scores.tolist())
+        ]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        vectorizer = {"vocabulary": self.vocabulary, "idf": self.idf.tolist()}
+        if self.document_frequency is not None:
+            vectorizer["document_frequency"] = self.document_frequency.tolist()
+        with open(os.path.join(directory, "vectorizer.json"), "w", encoding="utf-8") as f:
+            json.dump(vectorizer, f)
+        if self.row_hashes is not None:
+            np.save(os.path.join(directory, "row_hashes.npy"), self.row_hashes)
+        with open(os.path.join(directory, "classes.json"), "w", encoding="utf-8") as f:
+            json.dump(self.classes, f)
+        np.savez(os.path.join(directory, "weights.npz"), *self.weights)
+        if self.scales is not None:
+            np.savez(os.path.join(directory, "scales.npz"), *self.scales)
+        # meta.json is written last so a half-written bundle is never picked up
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(dict(self.meta, version=self.version), f, indent=2)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "vectorizer.json"), encoding="utf-8") as f:
+            vectorizer = json.load(f)
+        with open(os.path.join(directory, "classes.json"), encoding="utf-8") as f:
+            classes = json.load(f)
+        with np.load(os.path.join(directory, "weights.npz")) as data:
+            weights = [data[f"arr_{i}"] for i in range(len(data.files))]
+        hashes_path = os.path.join(directory, "row_hashes.npy")
+        row_hashes = np.load(hashes_path) if os.path.isfile(hashes_path) else None
+        scales = None
+        if os.path.isfile(os.path.join(directory, "scales.npz")):
+            with np.load(os.path.join(directory, "scales.npz")) as data:
+                scales = [data[f"arr_{i}"] for i in range(len(data.files))]
+        return cls(meta["version"], vectorizer["vocabulary"], vectorizer["idf"], classes, weights, meta,
+                   document_frequency=vectorizer.get("document_frequency"), row_hashes=row_hashes,
+                   scales=scales)
+
+
+# --- TRAINING ---
+def csv_hash(csv_path=CSV_PATH):
+    """SHA-256 of the training CSV contents."""
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_keras_model(n_features, n_classes, weights=None, sparse=False):
+    """The Dense 16-16-softmax network, optionally initialised from exported weights."""
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(n_features,), sparse=sparse),
+        tf.keras.layers.Dense(16, activation="relu"),
+        tf.keras.layers.Dense(16, activation="relu"),
+        tf.keras.layers.Dense(n_classes, activation="softmax")
+    ])
+    if weights is not None:
+        model.set_weights(weights)
+    return model
+
+
+def read_chunks(csv_path=CSV_PATH, chunksize=50000):
+    """Stream the training CSV as DataFrames of at most ``chunksize`` rows."""
+    import pandas as pd
+
+    reader = pd.read_csv(csv_path, encoding="utf-8", on_bad_lines="skip", dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        # Handle missing values
+        chunk = chunk.dropna()
+        if len(chunk):
+            yield chunk
+
+
+def _analyzer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer().build_analyzer()
+
+
+def _smooth_idf(document_frequency, documents):
+    # sklearn's default (smooth_idf=True) formula
+    return np.log((1 + documents) / (1 + np.asarray(document_frequency, dtype=np.float64))) + 1
+
+
+def row_hashes(chunk):
+    """Stable 64-bit hashes identifying (intent, pattern) training rows."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f"{intent}\x1f{pattern}".encode("utf-8"), digest_size=8).digest(), "little")
+         for intent, pattern in zip(chunk["intent"], chunk["pattern"])),
+        dtype=np.uint64, count=len(chunk),
+    )
+
+
+VocabularyScan = namedtuple(
+    "VocabularyScan", "vocabulary idf classes rows steps document_frequency row_hashes",
+)
+
+
+def scan_vocabulary(csv_path=CSV_PATH, chunksize=50000, batch_size=32):
+    """First pass over the CSV: fit the TF-IDF vocabulary and IDF, and collect labels.
+
+    Produces the same vocabulary and IDF as ``TfidfVectorizer().fit`` while
+    holding only per-term document counts in memory. ``steps`` is the number
+    of mini-batches in one epoch over the CSV.
+    """
+    analyzer = _analyzer()
+    document_frequency = Counter()
+    classes = set()
+    hashes = []
+    rows = steps = 0
+    for chunk in read_chunks(csv_path, chunksize):
+        for text in chunk["pattern"]:
+            document_frequency.update(set(analyzer(text)))
+        classes.update(chunk["intent"])
+        hashes.append(row_hashes(chunk))
+        rows += len(chunk)
+        steps += -(-len(chunk) // batch_size)
+
+    terms = sorted(document_frequency)
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    df = np.array([document_frequency[term] for term in terms], dtype=np.int64)
+    return VocabularyScan(
+        vocabulary, _smooth_idf(df, rows), sorted(classes), rows, steps, df,
+        np.unique(np.concatenate(hashes)) if hashes else np.empty(0, dtype=np.uint64),
+    )
+
+
+def training_batches(bundle, chunks, batch_size=32, seed=0):
+    """Endless ``(tf.SparseTensor, labels)`` mini-batches, one pass of ``chunks()`` per epoch.
+
+    ``chunks`` is a zero-argument callable returning an iterable of
+    DataFrames with ``intent`` and ``pattern`` columns. Features stay sparse
+    float32 end to end; rows are shuffled within each chunk.
+    """
+    import tensorflow as tf
+
+    class_index = {label: i for i, label in enumerate(bundle.classes)}
+    rng = np.random.default_rng(seed)
+    while True:
+        for chunk in chunks():
+            features = bundle.vectorizer.transform(chunk["pattern"])
+            labels = chunk["intent"].map(class_index).to_numpy(np.int64)
+            order = rng.permutation(len(labels))
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                batch = features[rows].tocoo()
+                indices = np.stack([batch.row, batch.col], axis=1).astype(np.int64)
+                sparse = tf.sparse.reorder(tf.SparseTensor(indices, batch.data, batch.shape))
+                yield sparse, labels[rows]
+
+
+def _fit(bundle, chunks, steps, epochs, batch_size, verbose, initial_weights=None):
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_generator(
+        lambda: training_batches(bundle, chunks, batch_size),
+        output_signature=(
+            tf.SparseTensorSpec(shape=(None, len(bundle.vocabulary)), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int64),
+        ),
+    )
+    model = build_keras_model(len(bundle.vocabulary), len(bundle.classes), initial_weights, sparse=True)
+    model.compile(loss="sparse_categorical_crossentropy", optimizer="adam", metrics=["accuracy"])
+    model.fit(dataset, steps_per_epoch=steps, epochs=epochs, verbose=verbose, shuffle=False)
+    bundle.weights = [np.asarray(w) for w in model.get_weights()]
+    bundle._network = None
+
+
+def _new_version(data_hash):
+    return f"{time.strftime('%Y%m%d%H%M%S')}-{data_hash[:12]}"
+
+
+def train(csv_path=CSV_PATH, epochs=50, verbose=0, batch_size=32, chunksize=50000):
+    """Fit the TF-IDF vectorizer and the Keras network on the training CSV.
+
+    The CSV is streamed in ``chunksize`` row chunks and the network is fed
+    sparse mini-batches, so peak memory does not grow with the dataset.
+    """
+    data_hash = csv_hash(csv_path)
+    scan = scan_vocabulary(csv_path, chunksize, batch_size)
+    meta = {
+        "csv_sha256": data_hash,
+        "rows": scan.rows,
+        "epochs": epochs,
+        "batch_size": batch_size,
+        "created_at": time.time(),
+    }
+    bundle = IntentBundle(_new_version(data_hash), scan.vocabulary, scan.idf, scan.classes, [], meta,
+                          document_frequency=scan.document_frequency, row_hashes=scan.row_hashes)
+    _fit(bundle, lambda: read_chunks(csv_path, chunksize), scan.steps, epochs, batch_size, verbose)
+    return bundle
+
+
+# --- INCREMENTAL TRAINING ---
+CHAT_RESPONSE_PREFIX = "Predicted intent: "
+
+
+def new_chat_rows(watermark, chunksize=5000):
+    """Chat rows with id > ``watermark`` as (id, intent, pattern) DataFrames.
+
+    Logged chats carry no human label, so the intent recorded in the reply
+    (the model's own prediction at the time) is used as the label. Training
+    on these reinforces the model's past mistakes, which is why
+    ``train_incremental`` only reads them with ``include_chats=True``.
+    """
+    import pandas as pd
+
+    from .models import Chat
+
+    rows = (Chat.objects.filter(id__gt=watermark, response__startswith=CHAT_RESPONSE_PREFIX)
+            .order_by("id").values_list("id", "message", "response").iterator(chunk_size=chunksize))
+    batch = []
+    for pk, message, response in rows:
+        batch.append((pk, response[len(CHAT_RESPONSE_PREFIX):], message))
+        if len(batch) == chunksize:
+            yield pd.DataFrame(batch, columns=["id", "intent", "pattern"])
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=["id", "intent", "pattern"])
+
+
+def _extend(bundle, frames):
+    """Grow ``bundle`` in place to cover new terms and labels in ``frames``.
+
+    New vocabulary terms are appended (existing indices never move) and get
+    zero rows in the first-layer kernel; new labels get zero output columns.
+    The IDF is recomputed from the accumulated document frequencies. Old
+    predictions therefore barely change until the extended model is trained.
+    """
+    analyzer = _analyzer()
+    df = list(bundle.document_frequency)
+    vocabulary = dict(bundle.vocabulary)
+    documents = bundle.meta.get("documents", bundle.meta.get("rows", 0))
+    for frame in frames:
+        for text in frame["pattern"]:
+            for term in set(analyzer(text)):
+                index = vocabulary.get(term)
+                if index is None:
+                    index = vocabulary[term] = len(df)
+                    df.append(0)
+                df[index] += 1
+        documents += len(frame)
+
+    weights = [np.array(w, dtype=np.float32) for w in bundle.weights]
+    new_terms = len(vocabulary) - weights[0].shape[0]
+    if new_terms:
+        weights[0] = np.vstack([weights[0], np.zeros((new_terms, weights[0].shape[1]), np.float32)])
+    new_classes = sorted({label for frame in frames for label in frame["intent"]} - set(bundle.classes))
+    if new_classes:
+        weights[-2] = np.hstack([weights[-2], np.zeros((weights[-2].shape[0], len(new_classes)), np.float32)])
+        weights[-1] = np.concatenate([weights[-1], np.zeros(len(new_classes), np.float32)])
+
+    bundle.vocabulary = vocabulary
+    bundle.document_frequency = np.asarray(df, dtype=np.int64)
+    bundle.idf = _smooth_idf(bundle.document_frequency, documents)
+    bundle.classes = bundle.classes + new_classes
+    bundle.weights = weights
+    bundle.meta["documents"] = documents
+    bundle._vectorizer = bundle._network = None
+    return new_terms, new_classes
+
+
+def train_incremental(base, csv_path=CSV_PATH, epochs=5, verbose=0, batch_size=32,
+                      chunksize=50000, replay=1.0, seed=0, include_chats=False):
+    """Warm-start a new bundle from ``base`` using only data it has not seen.
+
+    Consumes CSV rows whose (intent, pattern) hash is not in ``base`` (plus,
+    with ``include_chats``, Chat rows newer than its ``chat_watermark``,
+    self-labelled by ``new_chat_rows``), mixed with ``replay`` times as many
+    randomly sampled old CSV rows so earlier intents are not forgotten.
+    Returns None when there is nothing new to learn from.
+    """
+    import pandas as pd
+
+    if base.document_frequency is None or base.row_hashes is None:
+        raise ValueError(f"Bundle {base.version} predates incremental training; run a full train first")
+
+    rng = np.random.default_rng(seed)
+    data_hash = csv_hash(csv_path)
+    seen = base.row_hashes
+    fresh, replayable, all_hashes = [], [], []
+    for chunk in read_chunks(csv_path, chunksize):
+        hashes = row_hashes(chunk)
+        all_hashes.append(hashes)
+        is_new = ~np.isin(hashes, seen)
+        if is_new.any():
+            fresh.append(chunk[is_new][["intent", "pattern"]])
+        replayable.append(chunk[~is_new][["intent", "pattern"]])
+
+    watermark = base.meta.get("chat_watermark", 0)
+    chats = list(new_chat_rows(watermark)) if include_chats else []
+    if chats:
+        watermark = int(max(frame["id"].max() for frame in chats))
+        fresh += [frame[["intent", "pattern"]] for frame in chats]
+    if not fresh:
+        return None
+
+    new_rows = pd.concat(fresh, ignore_index=True)
+    old_rows = pd.concat(replayable, ignore_index=True) if replayable else new_rows.iloc[:0]
+    replay_rows = old_rows.sample(n=min(len(old_rows), int(len(new_rows) * replay)),
+                                  random_state=int(rng.integers(1 << 31)))
+    training_rows = pd.concat([new_rows, replay_rows], ignore_index=True)
+
+    bundle = IntentBundle(_new_version(data_hash), base.vocabulary, base.idf, base.classes, base.weights,
+                          dict(base.meta), document_frequency=base.document_frequency)
+    new_terms, new_classes = _extend(bundle, [new_rows])
+    bundle.row_hashes = np.unique(np.concatenate(all_hashes))
+    bundle.meta.update({
+        "csv_sha256": data_hash,
+        "parent": base.version,
+        "chat_watermark": watermark,
+        "incremental_rows": len(new_rows),
+        "replay_rows": len(replay_rows),
+        "new_terms": new_terms,
+        "new_classes": new_classes,
+        "epochs": epochs,
+        "created_at": time.time(),
+    })
+    initial_weights = bundle.weights
+    steps = -(-len(training_rows) // batch_size)
+    _fit(bundle, lambda: [training_rows], steps, epochs, batch_size, verbose, initial_weights)
+    return bundle
+
+
+# --- REGISTRY ---
+def artifact_dir():
+    return str(getattr(settings, "INTENT_MODEL_DIR", os.path.join(os.path.dirname(__file__), "intent_models")))
+
+
+def list_versions():
+    """Complete bundle versions on disk, oldest first."""
+    root = artifact_dir()
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if os.path.isfile(os.path.join(root, name, "meta.json"))
+    )
+
+
+def latest_version():
+    """The version named by the LATEST pointer, falling back to the newest bundle."""
+    pointer = os.path.join(artifact_dir(), LATEST_POINTER)
+    if os.path.isfile(pointer):
+        with open(pointer, encoding="utf-8") as f:
+            version = f.read().strip()
+        if os.path.isfile(os.path.join(artifact_dir(), version, "meta.json")):
+            return version
+    versions = list_versions()
+    return versions[-1] if versions else None
+
+
+def publish(bundle):
+    """Write a bundle to the registry and point LATEST at it."""
+    root = artifact_dir()
+    bundle.save(os.path.join(root, bundle.version))
+    tmp_pointer = os.path.join(root, f".{LATEST_POINTER}.{os.getpid()}")
+    with open(tmp_pointer, "w", encoding="utf-8") as f:
+        f.write(bundle.version)
+    os.replace(tmp_pointer, os.path.join(root, LATEST_POINTER))
+    return bundle.version
+
+
+def load_bundle(version=None):
+    version = version or latest_version()
+    if version is None:
+        return None
+    return IntentBundle.load(os.path.join(artifact_dir(), version))
+
+
+def train_if_changed(csv_path=CSV_PATH, epochs=50, force=False, verbose=0):
+    """Train and publish a new bundle unless the latest one was built from the same CSV.
+
+    Returns ``(bundle, trained)``.
+    """
+    if not force:
+        current = load_bundle()
+        if current is not None and current.meta.get("csv_sha256") == csv_hash(csv_path):
+            return current, False
+    bundle = train(csv_path, epochs=epochs, verbose=verbose)
+    publish(bundle)
+    return bundle, True
+
+
+def update_incrementally(csv_path=CSV_PATH, epochs=5, verbose=0, include_chats=False):
+    """Publish a warm-started bundle built from new CSV (and, optionally, Chat) rows only.
+
+    Falls back to a full ``train_if_changed`` when there is no bundle yet or
+    the latest one predates incremental training. Returns ``(bundle, trained)``.
+    """
+    current = load_bundle()
+    if current is not None and current.quantized and current.meta.get("source_version"):
+        # Warm-start from the float bundle the quantized export was made from
+        current = load_bundle(current.meta["source_version"])
+    if current is None or current.row_hashes is None or current.document_frequency is None:
+        return train_if_changed(csv_path, verbose=verbose)
+    bundle = train_incremental(current, csv_path, epochs=epochs, verbose=verbose, include_chats=include_chats)
+    if bundle is None:
+        return current, False
+    publish(bundle)
+    return bundle, True
+
+
+def pointer_stamp():
+    """Identity of the LATEST pointer file (None before anything is published).
+
+    ``publish`` replaces the file, so the inode changes even when two
+    publishes land within the filesystem's mtime resolution.
+    """
+    try:
+        stat = os.stat(os.path.join(artifact_dir(), LATEST_POINTER))
+        return stat.st_ino, stat.st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def warm_up(bundle):
+    """Build the vectorizer and network and run one prediction so the first request is not cold."""
+    bundle.predict(["hello"])
+    return bundle
+
+
+# --- HOT RELOAD ---
+class ModelHolder:
+    """Holds the serving bundle and swaps in newly published versions without a restart.
+
+    A watcher thread polls the LATEST pointer every ``interval`` seconds. A new
+    version is loaded and warmed up in that thread, then the reference is
+    replaced in one assignment; requests that already hold the old bundle
+    finish on it.
+    """
+
+    def __init__(self, interval=0, bundle=None):
+        self.interval = interval
+        self._bundle = bundle
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def get(self):
+        bundle = self._bundle
+        if bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._stamp = pointer_stamp()
+                    self._bundle = self._initial()
+                    self.start_watching()
+                bundle = self._bundle
+        return bundle
+
+    def _initial(self):
+        pinned = getattr(settings, "INTENT_MODEL_VERSION", None)
+        bundle = load_bundle(pinned)
+        if bundle is None:
+            if pinned:
+                raise LookupError(f"Intent model version {pinned!r} not found in {artifact_dir()}")
+            # Training belongs offline, never on the request path
+            raise LookupError(f"No intent model bundle found in {artifact_dir()}; "
+                              "run `manage.py train_intent_model` before starting workers")
+        return bundle
+
+    def reload(self):
+        """Swap in the latest published version if it differs. Returns True if swapped."""
+        if getattr(settings, "INTENT_MODEL_VERSION", None):
+            return False
+        version = latest_version()
+        current = self._bundle
+        if version is None or (current is not None and current.version == version):
+            return False
+        bundle = warm_up(load_bundle(version))
+        self._bundle = bundle
+        logger.info("Swapped intent model %s -> %s", current and current.version, bundle.version)
+        return True
+
+    def check(self):
+        """Reload if the LATEST pointer changed since the last check."""
+        stamp = pointer_stamp()
+        if stamp == self._stamp:
+            return False
+        swapped = self.reload()
+        # Only after a successful reload, so a failed one is retried on the next check
+        self._stamp = stamp
+        return swapped
+
+    def start_watching(self):
+        if self.interval and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="intent-model-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Intent model reload failed; still serving %s", self._bundle.version)
+
+
+_holder = None
+_holder_lock = threading.Lock()
+
+
+def get_holder():
+    global _holder
+    if _holder is None:
+        with _holder_lock:
+            if _holder is None:
+                _holder = ModelHolder(getattr(settings, "INTENT_MODEL_RELOAD_INTERVAL", 0))
+    return _holder
+
+
+def get_bundle():
+    """The bundle used for serving: the pinned INTENT_MODEL_VERSION, else the latest one."""
+    return get_holder().get()
@@ -0,0 +1,97 @@
+import numpy as np
+
+# --- HAND LANDMARKS ---
+# MediaPipe's 21 hand landmarks as one (21, 3) float32 array of (x, y, z) per
+# hand, or (..., 21, 3) for many hands or frames. y grows downwards, so a
+# finger is up when its tip is above (smaller y than) the joint below it.
+
+WRIST, THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP = 0, 4, 8, 12, 16, 20
+
+FINGER_NAMES = ("Index", "Middle", "Ring", "Pinky", "Thumb")
+_TIPS = np.array([8, 12, 16, 20, 4])
+# PIP joints for the fingers; the IP joint for the thumb
+_JOINTS = np.array([6, 10, 14, 18, 3])
+
+GESTURES = ("No Gesture", "👍 Like", "👎 Dislike", "👉 Pointing", "🤘 Rock On", "🤙 Call Me", "👌 OK", "✋ Stop")
+
+
+def hand_array(hand_landmarks):
+    """One MediaPipe ``NormalizedLandmarkList`` as a (21, 3) float32 array."""
+    return np.array([(p.x, p.y, p.z) for p in hand_landmarks.landmark], dtype=np.float32)
+
+
+def hands_array(multi_hand_landmarks):
+    """Every detected hand of a frame as one (hands, 21, 3) array."""
+    if not multi_hand_landmarks:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.array(
+        [[(p.x, p.y, p.z) for p in hand.landmark] for hand in multi_hand_landmarks], dtype=np.float32,
+    )
+
+
+def fingers_up(points):
+    """(..., 5) booleans in ``FINGER_NAMES`` order: is each finger raised?"""
+    return points[..., _TIPS, 1] < points[..., _JOINTS, 1]
+
+
+def pinch_distance(points, a=THUMB_TIP, b=INDEX_TIP):
+    """Distance in the image plane between two landmarks (thumb and index tips by default)."""
+    delta = points[..., a, :2] - points[..., b, :2]
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+# --- GESTURES ---
+# chatbot.py's rules only look at the five finger states and whether the ring
+# and pinky tips are below their PIP joints, so every hand reduces to a 7-bit
+# code and its gesture is a lookup in a 128-entry table built from the rules.
+
+def _gesture_rule(up, ring_down, pinky_down):
+    count, thumb = sum(up), up[4]
+    if count == 1:
+        return 1 if thumb else 2
+    if count == 2 and not thumb:
+        return 3
+    if count == 2 and ring_down:
+        return 4
+    if count == 2 and pinky_down:
+        return 5
+    if count == 4:
+        return 6
+    if count == 5:
+        return 7
+    return 0
+
+
+# Bits 0-4 are fingers_up; bit 5 is "ring tip below its PIP" (y16 > y14), bit 6 the same for the pinky
+_CODE_ABOVE = np.concatenate([_TIPS, [14, 18]])
+_CODE_BELOW = np.concatenate([_JOINTS, [16, 20]])
+_CODE_WEIGHTS = 1 << np.arange(7, dtype=np.int16)
+_GESTURE_TABLE = np.array([
+    _gesture_rule([bool(code >> bit & 1) for bit in range(5)], bool(code & 32), bool(code & 64))
+    for code in range(128)
+], dtype=np.int8)
+
+
+def classify(points):
+    """``(fingers_up, gesture_ids)`` from a single comparison of the landmark y coordinates."""
+    bits = points[..., _CODE_ABOVE, 1] < points[..., _CODE_BELOW, 1]
+    return bits[..., :5], _GESTURE_TABLE[bits @ _CODE_WEIGHTS]
+
+
+def gesture_ids(points):
+    """Index into ``GESTURES`` for each hand, with the rules chatbot.py has always used."""
+    return classify(points)[1]
+
+
+def gestures(points):
+    """Gesture labels for (21, 3) or (hands, 21, 3) points: a str or a list of str."""
+    ids = gesture_ids(points)
+    if np.ndim(ids) == 0:
+        return GESTURES[int(ids)]
+    return [GESTURES[i] for i in ids.ravel().tolist()]
+
+
+def raised_names(up):
+    """Comma-separated names of the raised fingers in one ``fingers_up`` row, e.g. "Index, Thumb"."""
+    names = [name for name, raised in zip(FINGER_NAMES, up.tolist()) if raised]
+    return ", ".join(names) if names else "No Fingers Raised"
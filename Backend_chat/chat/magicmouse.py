@@ -1,122 +1,137 @@
+"""Hand-tracked mouse control with voice commands to open applications.
+
+Run from Backend_chat: ``python -m chat.magicmouse [--source clip.mp4] [--headless]``.
+Capture, hand tracking and drawing run as separate pipeline stages (``chat.pipeline``).
+"""
+import argparse
+import queue
+import subprocess
+import threading
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
-import os
-import time
-import speech_recognition as sr
 import pyttsx3
 
+from .cursor import CursorActuator, PyAutoGUIBackend, RecordingBackend
+from .landmarks import INDEX_TIP, hand_array, pinch_distance
+from .pipeline import Pipeline, VideoSource, format_report
+from .voice import SpeechRecognitionBackend, VoiceListener
+
 # Initialize MediaPipe Hands
 mp_hands = mp.solutions.hands
 mp_draw = mp.solutions.drawing_utils
 hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7)
 
-# Screen width and height
-screen_width, screen_height = pyautogui.size()
+# Voice assistant setup: pyttsx3 blocks while talking, so it gets its own thread
+speech_queue = queue.Queue()
+
+
+def _speaker():
+    engine = pyttsx3.init()
+    while True:
+        engine.say(speech_queue.get())
+        engine.runAndWait()
+
 
-# Voice assistant setup
-engine = pyttsx3.init()
+threading.Thread(target=_speaker, name="speaker", daemon=True).start()
 
-# Function to open applications
+# Function to open applications; Popen returns as soon as the app is launched
 def open_app(app_name):
     if "notepad" in app_name:
-        os.system("notepad")
+        subprocess.Popen("notepad", shell=True)
     elif "chrome" in app_name:
-        os.system("start chrome")
+        subprocess.Popen("start chrome", shell=True)
     elif "file explorer" in app_name:
-        os.system("explorer")
+        subprocess.Popen("explorer", shell=True)
     elif "command prompt" in app_name:
-        os.system("cmd")
+        subprocess.Popen("start cmd", shell=True)
     else:
         speak(f"Application {app_name} not found.")
 
 # Function to speak
 def speak(text):
-    engine.say(text)
-    engine.runAndWait()
-
-# Function to listen for voice commands
-def listen_command():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Listening for command...")
-        recognizer.adjust_for_ambient_noise(source)
-        audio = recognizer.listen(source)
-    
-    try:
-        command = recognizer.recognize_google(audio).lower()
-        print(f"Command: {command}")
-        return command
-    except sr.UnknownValueError:
-        return ""
-    except sr.RequestError:
-        return ""
-
-# Store last click time for double-click detection
-last_click_time = 0
+    speech_queue.put(text)
 
-# Open webcam
-cap = cv2.VideoCapture(0)
+# Voice commands are heard and recognised in the background (see chat.voice)
+voice = None
 
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
+# Cursor moves and clicks happen on the actuator's thread (see chat.cursor)
+cursor = None
 
-    # Flip the frame
-    frame = cv2.flip(frame, 1)
-    h, w, _ = frame.shape
 
+def infer(frame):
+    """Track the hand and hand the fingertip to the cursor; returns the landmarks for drawing."""
     # Convert to RGB
     rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     results = hands.process(rgb_frame)
 
     if results.multi_hand_landmarks:
         for hand_landmarks in results.multi_hand_landmarks:
-            # Get index finger and thumb positions
-            index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-
-            # Convert to screen coordinates
-            x = int(index_tip.x * screen_width)
-            y = int(index_tip.y * screen_height)
-
-            # Move mouse
-            pyautogui.moveTo(x, y)
-
-            # Calculate distance between thumb and index finger
-            distance = np.linalg.norm(
-                np.array([index_tip.x, index_tip.y]) -
-                np.array([thumb_tip.x, thumb_tip.y])
-            )
-
-            # Click if fingers are close
-            if distance < 0.05:
-                current_time = time.time()
-                if current_time - last_click_time < 0.3:  # Double-tap
-                    pyautogui.doubleClick()
-                    print("Double Clicked!")
-                else:
-                    pyautogui.click()
-                    print("Single Clicked!")
-                
-                last_click_time = current_time  # Update last click time
-
-            # Draw hand landmarks
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            # Index fingertip position and its distance to the thumb tip
+            points = hand_array(hand_landmarks)
+            index_x, index_y = points[INDEX_TIP, :2].tolist()
+            distance = float(pinch_distance(points))
+
+            # Move mouse; pinching the fingers together clicks, twice quickly double-clicks
+            event = cursor.update(index_x, index_y, distance)
+            if event == "double_click":
+                print("Double Clicked!")
+            elif event == "click":
+                print("Single Clicked!")
+    return results.multi_hand_landmarks or []
+
+
+def render(frame, hand_landmarks_list, show=True):
+    # Draw hand landmarks
+    for hand_landmarks in hand_landmarks_list:
+        mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
     # Show webcam feed
-    cv2.imshow("Hand Control System", frame)
+    if show:
+        cv2.imshow("Hand Control System", frame)
 
-    # Listen for voice command
-    command = listen_command()
-    if command:
+    # Voice commands recognised since the last frame; never waits for the microphone
+    for command in voice.poll() if voice is not None else ():
+        print(f"Command: {command}")
         open_app(command)  # Open application with voice
 
     # Exit on 'q' key
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+    return not show or cv2.waitKey(1) & 0xFF != ord('q')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="0", help="Camera index or video file.")
+    parser.add_argument("--headless", action="store_true", help="Do not open a window; print the stage report.")
+    parser.add_argument("--voice", choices=["google", "sphinx", "off"], default="google",
+                        help="Speech recognition engine (sphinx works offline).")
+    parser.add_argument("--cursor", choices=["pyautogui", "record"], default="pyautogui",
+                        help="'record' only records moves and clicks and reports their latency.")
+    parser.add_argument("--cursor-rate", type=int, default=120, help="Cursor moves per second at most.")
+    args = parser.parse_args()
+    source = int(args.source) if args.source.isdigit() else args.source
+
+    global cursor, voice
+    backend = PyAutoGUIBackend() if args.cursor == "pyautogui" else RecordingBackend()
+    cursor = CursorActuator(backend, rate=args.cursor_rate)
+    if args.voice != "off":
+        voice = VoiceListener(SpeechRecognitionBackend(args.voice)).start()
+
+    # Open webcam, mirrored so the cursor follows the hand
+    video = VideoSource(source, flip=True)
+    try:
+        report = Pipeline(video.read, infer, lambda frame, result: render(frame, result, not args.headless)).run()
+    finally:
+        cursor.stop()
+        if voice is not None:
+            voice.stop(timeout=1)
+        video.close()
+        cv2.destroyAllWindows()
+    print(format_report(report))
+    if cursor.latency_ms:
+        p50, p95 = np.percentile(cursor.latency_ms, [50, 95])
+        print(f"cursor     {cursor.moves} moves  update-to-move p50={p50:.2f}ms p95={p95:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from chat.benchmarking import (
+    QueryCounter, asgi_request, current_rss_mb, peak_rss_mb, percentiles, training_patterns, wsgi_request,
+)
+from chat.intent_model import get_bundle
+from chat.models import User
+
+ENDPOINTS = ("register", "login", "send_message", "balance", "details")
+PASSWORD = "bench-password"
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _transport(kind):
+    """``call(method, path, headers, body) -> (status, body)`` through the WSGI or ASGI handler."""
+    if kind == "asgi":
+        from django.core.asgi import get_asgi_application
+
+        app = get_asgi_application()
+        loop = asyncio.new_event_loop()  # one loop for the whole run, as under a real ASGI server
+        return lambda *args: loop.run_until_complete(asgi_request(app, *args))
+    from django.core.wsgi import get_wsgi_application
+
+    app = get_wsgi_application()
+    return lambda *args: wsgi_request(app, *args)
+
+
+def run_benchmark(client="wsgi", users=20, requests=500, endpoints=ENDPOINTS):
+    """Drive the chat API in-process and return per-endpoint latency, throughput and query stats.
+
+    Runs against whatever database is configured; ``manage.py bench`` wraps
+    it in a throwaway test database.
+    """
+    call = _transport(client)
+    messages = training_patterns()
+    run = uuid.uuid4().hex[:8]
+    names = [f"bench-{run}-{i}" for i in range(users)]
+    tokens = {}
+    get_bundle()  # load the model outside the measurement
+
+    def register(i):
+        body = json.dumps({"username": names[i], "password": PASSWORD}).encode()
+        status, content = call("POST", "/api/users/", [("Content-Type", "application/json")], body)
+        if status != 200:
+            raise RuntimeError(f"Registering a bench user failed ({status}): {content[:200]!r}")
+        tokens[i] = json.loads(content)["token"]
+        return status
+
+    def login(i):
+        body = json.dumps({"username": names[i % users], "password": PASSWORD}).encode()
+        return call("POST", "/api/auth/login/", [("Content-Type", "application/json")], body)[0]
+
+    def authorized(method, path, i, body=b""):
+        headers = [("Authorization", f"Token {tokens[i % users]}"), ("Content-Type", "application/json")]
+        return call(method, path, headers, body)[0]
+
+    plan = {
+        "register": (users, register),
+        "login": (users, login),
+        "send_message": (requests, lambda i: authorized(
+            "POST", "/api/chat/send_message/", i,
+            json.dumps({"message": messages[i % len(messages)]}).encode())),
+        "balance": (requests, lambda i: authorized("GET", "/api/token-balance/balance/", i)),
+        "details": (requests, lambda i: authorized("GET", "/api/user-details/details/", i)),
+    }
+
+    counter = QueryCounter().install()
+    results = {}
+    try:
+        # Users are always registered, even when only other endpoints are reported
+        for name in ("register",) + tuple(e for e in ENDPOINTS if e != "register" and e in endpoints):
+            count, fn = plan[name]
+            if name == "send_message":
+                # Enough balance that no request is refused for tokens
+                User.objects.filter(username__in=names).update(tokens=10 ** 9)
+            if name != "register":
+                fn(0)  # warm up
+            samples, failures = [], 0
+            queries_before = counter.count
+            started = time.perf_counter()
+            for i in range(count):
+                start = time.perf_counter()
+                status = fn(i)
+                samples.append((time.perf_counter() - start) * 1000)
+                failures += status != 200
+            elapsed = time.perf_counter() - started
+            if name in endpoints:
+                results[name] = dict(
+                    percentiles(samples),
+                    requests=count,
+                    failures=failures,
+                    mean=sum(samples) / count,
+                    rps=count / elapsed,
+                    queries_per_request=(counter.count - queries_before) / count,
+                    rss_mb=current_rss_mb(),
+                )
+    finally:
+        counter.uninstall()
+    return results
+
+
+def compare(baseline, results, threshold):
+    """Lines describing p95/throughput changes against ``baseline``, and whether any regressed."""
+    lines, regressed = [], False
+    for name, current in results.items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        p95 = (current["p95"] - before["p95"]) / before["p95"] * 100 if before["p95"] else 0.0
+        rps = (current["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        worse = p95 > threshold or rps < -threshold
+        regressed |= worse
+        lines.append(f"{name:<13} p95 {p95:+6.1f}%  req/s {rps:+6.1f}%{'  REGRESSION' if worse else ''}")
+    return lines, regressed
+
+
+class Command(BaseCommand):
+    help = ("Benchmark register, login, send_message, balance and details in-process against a "
+            "throwaway database and write the results to JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--client", choices=["wsgi", "asgi"], default="wsgi")
+        parser.add_argument("--users", type=int, default=20, help="Synthetic users (register/login requests).")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per authenticated endpoint.")
+        parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+        parser.add_argument("--output", help="JSON file (default: bench_results/<time>-<commit>.json).")
+        parser.add_argument("--baseline", help="Earlier JSON result to compare against.")
+        parser.add_argument("--threshold", type=float, default=10.0,
+                            help="Percent p95/throughput change counted as a regression.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        commit = _git_commit()
+        started_at = datetime.now(timezone.utc)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = run_benchmark(options["client"], options["users"], options["requests"], options["endpoints"])
+            vendor = connection.vendor
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<13} {stats['rps']:>8.0f} req/s  p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms "
+                f"p99={stats['p99']:.2f}ms  {stats['queries_per_request']:.2f} queries/req  "
+                f"failures={stats['failures']}"
+            )
+        self.stdout.write(f"peak rss {peak_rss_mb():.1f}MB")
+
+        report = {
+            "commit": commit,
+            "started_at": started_at.isoformat(),
+            "client": options["client"],
+            "users": options["users"],
+            "requests": options["requests"],
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": vendor,
+                **{name: getattr(settings, name, None) for name in (
+                    "USER_CACHE", "INTENT_CACHE", "INTENT_BATCHING", "CHAT_WRITE_BEHIND", "INTENT_INFERENCE_POOL",
+                )},
+            },
+            "peak_rss_mb": peak_rss_mb(),
+            "endpoints": results,
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "bench_results", f"{started_at:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        self.stdout.write(f"results written to {output}")
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                lines, regressed = compare(json.load(f), results, options["threshold"])
+            for line in lines:
+                self.stdout.write(line)
+            if regressed and options["fail_on_regression"]:
+                raise CommandError("Performance regression against baseline")
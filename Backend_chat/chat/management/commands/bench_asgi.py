@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.authtoken.models import Token
+
+from chat.benchmarking import asgi_request, percentiles, training_patterns, wsgi_request
+from chat.intent_model import get_bundle
+from chat.models import User
+
+ENDPOINTS = {
+    "send_message": ("POST", "/api/chat/send_message/", "/api/async/chat/send_message/"),
+    "balance": ("GET", "/api/token-balance/balance/", "/api/async/token-balance/balance/"),
+    "details": ("GET", "/api/user-details/details/", "/api/async/user-details/details/"),
+}
+
+
+class Command(BaseCommand):
+    help = "Throughput and tail latency of WSGI vs ASGI (sync and native async views) under many concurrent clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="send_message")
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument("--requests-per-client", type=int, default=3)
+        parser.add_argument("--wsgi-threads", type=int, default=32,
+                            help="Worker threads of the simulated threaded WSGI server.")
+
+    async def _drive(self, call, clients, per_client, messages):
+        latencies, failures = [], 0
+
+        async def client(n):
+            nonlocal failures
+            for i in range(per_client):
+                start = time.perf_counter()
+                status = await call(messages[(n + i) % len(messages)])
+                latencies.append((time.perf_counter() - start) * 1000)
+                failures += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(clients)))
+        return time.perf_counter() - started, latencies, failures
+
+    def _report(self, label, elapsed, latencies, failures):
+        stats = percentiles(latencies)
+        self.stdout.write(
+            f"{label:<11} {len(latencies) / elapsed:>8.0f} req/s  p50={stats['p50']:.1f}ms "
+            f"p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms  failures={failures}"
+        )
+
+    def handle(self, *args, **options):
+        method, sync_path, async_path = ENDPOINTS[options["endpoint"]]
+        clients, per_client = options["clients"], options["requests_per_client"]
+        messages = training_patterns()
+        get_bundle()  # load the model outside the measurement
+
+        def body(message):
+            return json.dumps({"message": message}).encode() if method == "POST" else b""
+
+        # The benchmark user and its chats go to a throwaway test database
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = User.objects.create(username="bench", tokens=10 ** 9)
+            token = Token.objects.create(user=user)
+            headers = [("Authorization", f"Token {token.key}"), ("Content-Type", "application/json")]
+
+            wsgi_app = get_wsgi_application()
+            pool = ThreadPoolExecutor(max_workers=options["wsgi_threads"])
+
+            async def via_wsgi(message):
+                loop = asyncio.get_running_loop()
+                status, _ = await loop.run_in_executor(
+                    pool, wsgi_request, wsgi_app, method, sync_path, headers, body(message))
+                return status
+
+            self._report("wsgi", *asyncio.run(self._drive(via_wsgi, clients, per_client, messages)))
+            pool.shutdown()
+
+            asgi_app = get_asgi_application()
+            for label, path in (("asgi-sync", sync_path), ("asgi-async", async_path)):
+                async def via_asgi(message, path=path):
+                    status, _ = await asgi_request(asgi_app, method, path, headers, body(message))
+                    return status
+
+                self._report(label, *asyncio.run(self._drive(via_asgi, clients, per_client, messages)))
+        finally:
+            teardown_databases(old_config, verbosity=0)
@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from chat.benchmarking import percentiles
+from chat.cursor import CursorActuator, RecordingBackend
+
+
+def hand_track(frames, fps, jitter, seed=0):
+    """A synthetic fingertip: hold, sweep across the screen, hold; with two quick pinches.
+
+    Returns relative x, y and thumb-index distance per frame. The hand holds
+    still for the first 30% of the frames.
+    """
+    rng = np.random.default_rng(seed)
+    phase = np.linspace(0, 1, frames)
+    sweep = np.clip((phase - 0.3) / 0.4, 0, 1)
+    x = 0.2 + 0.6 * (3 * sweep ** 2 - 2 * sweep ** 3) + rng.normal(0, jitter, frames)
+    y = 0.5 + 0.1 * np.sin(np.pi * sweep) + rng.normal(0, jitter, frames)
+    distance = np.full(frames, 0.12) + rng.normal(0, 0.01, frames)
+    for start in (int(0.85 * frames), int(0.85 * frames) + int(0.2 * fps)):
+        # ~80 ms pinches hovering around the 0.05 threshold
+        distance[start:start + int(0.08 * fps)] = 0.045 + rng.normal(0, 0.006, int(0.08 * fps))
+    return x, y, distance
+
+
+class Command(BaseCommand):
+    help = "Replay a synthetic hand track through the old per-frame cursor logic and the CursorActuator."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--frames", type=int, default=600)
+        parser.add_argument("--fps", type=float, default=60)
+        parser.add_argument("--jitter", type=float, default=0.002, help="Landmark noise, relative to the frame.")
+        parser.add_argument("--rate", type=int, default=120, help="Actuator moves per second at most.")
+
+    def _report(self, label, backend, update_us, still, latency_ms=()):
+        """``still`` is the (start, end) perf_counter window in which the hand holds still."""
+        moves = [call for call in backend.calls if call[1] == "move"]
+        clicks = [call[1] for call in backend.calls if call[1] != "move"]
+        held = np.array([call[2:] for call in moves if still[0] <= call[0] < still[1]], dtype=float)
+        # Cursor distance travelled per second while the hand is (nominally) still
+        travel = np.abs(np.diff(held, axis=0)).sum() / (still[1] - still[0]) if len(held) > 1 else 0.0
+        cost = percentiles(update_us, (50, 99))
+        line = (
+            f"{label:<9} frame cost p50={cost['p50']:.1f}us p99={cost['p99']:.1f}us  {len(moves)} moves  "
+            f"still-hand travel {travel:.0f}px/s  clicks={clicks}"
+        )
+        if latency_ms:
+            latency = percentiles(latency_ms)
+            line += f"  update-to-move p50={latency['p50']:.2f}ms p95={latency['p95']:.2f}ms"
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        frames, fps = options["frames"], options["fps"]
+        x, y, distance = hand_track(frames, fps, options["jitter"])
+
+        def still_window(started):
+            # Skip the first half second so the filter has settled
+            return started + 0.5, started + 0.3 * frames / fps
+
+        # The old loop: move on every frame, click on every frame below 0.05 unless within 0.3 s
+        backend = RecordingBackend()
+        width, height = backend.size()
+        last_click, update_us = 0.0, []
+        run_started = time.perf_counter()
+        for i in range(frames):
+            started = time.perf_counter()
+            backend.move(int(x[i] * width), int(y[i] * height))
+            if distance[i] < 0.05:
+                now = i / fps
+                if now - last_click < 0.3:
+                    backend.double_click()
+                else:
+                    backend.click()
+                last_click = now
+            update_us.append((time.perf_counter() - started) * 1e6)
+            time.sleep(max(0.0, 1 / fps - (time.perf_counter() - started)))
+        self._report("direct", backend, update_us, still_window(run_started))
+        self.stdout.write("          (with pyautogui's default PAUSE each move or click also sleeps 100 ms)")
+
+        backend = RecordingBackend()
+        actuator = CursorActuator(backend, rate=options["rate"])
+        update_us = []
+        run_started = time.perf_counter()
+        for i in range(frames):
+            started = time.perf_counter()
+            actuator.update(x[i], y[i], distance[i], t=i / fps)
+            update_us.append((time.perf_counter() - started) * 1e6)
+            time.sleep(max(0.0, 1 / fps - (time.perf_counter() - started)))
+        time.sleep(0.05)
+        actuator.stop()
+        self._report("actuator", backend, update_us, still_window(run_started), list(actuator.latency_ms))
@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.authtoken.models import Token
+
+from chat.benchmarking import percentiles, training_patterns, wsgi_request
+from chat.intent_model import get_bundle
+from chat.models import User
+
+PROFILES = ("sqlite-legacy", "sqlite", "postgres")
+
+
+def postgres_available():
+    """Why the postgres profile cannot run here, or None if it can."""
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        return "psycopg is not installed"
+    import socket
+
+    host, port = os.getenv("POSTGRES_HOST", "localhost"), int(os.getenv("POSTGRES_PORT", "5432"))
+    try:
+        socket.create_connection((host, port), timeout=1).close()
+    except OSError:
+        return f"no PostgreSQL server on {host}:{port}"
+    return None
+
+
+class Command(BaseCommand):
+    help = "Concurrent send_message throughput under each DB_PROFILE, each in its own process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--requests-per-thread", type=int, default=50)
+        parser.add_argument("--child", action="store_true",
+                            help="Measure the current DB_PROFILE in this process (used internally).")
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            self.stdout.write(json.dumps(self._measure(options["threads"], options["requests_per_thread"])))
+            return
+
+        for profile in options["profiles"]:
+            reason = postgres_available() if profile == "postgres" else None
+            if reason:
+                self.stdout.write(f"{profile:<14} skipped: {reason}")
+                continue
+            output = subprocess.run(
+                [sys.executable, "manage.py", "bench_db_profiles", "--child",
+                 "--threads", str(options["threads"]),
+                 "--requests-per-thread", str(options["requests_per_thread"])],
+                cwd=settings.BASE_DIR, env=dict(os.environ, DB_PROFILE=profile),
+                capture_output=True, text=True,
+            )
+            if output.returncode:
+                self.stderr.write(f"{profile} failed:\n{output.stderr[-2000:]}")
+                continue
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{profile:<14} {result['rps']:>7.0f} req/s  p50={result['p50']:.1f}ms p95={result['p95']:.1f}ms "
+                f"p99={result['p99']:.1f}ms  errors={result['errors']} debited={result['debited']}  "
+                f"journal={result['journal_mode']}"
+            )
+
+    def _measure(self, threads, per_thread):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            get_bundle()
+            app = get_wsgi_application()
+            user = User.objects.create(username=f"bench-{uuid.uuid4().hex[:12]}", tokens=10 ** 9)
+            token = Token.objects.create(user=user)
+            headers = [("Authorization", f"Token {token.key}"), ("Content-Type", "application/json")]
+            messages = training_patterns()
+            journal_mode = "n/a"
+            if connection.vendor == "sqlite":
+                with connection.cursor() as cursor:
+                    journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            connection.close()
+
+            latencies, errors = [], []
+            barrier = threading.Barrier(threads)
+
+            def client(n):
+                barrier.wait()
+                for i in range(per_thread):
+                    body = json.dumps({"message": messages[(n + i) % len(messages)]}).encode()
+                    start = time.perf_counter()
+                    try:
+                        status, content = wsgi_request(app, "POST", "/api/chat/send_message/", headers, body)
+                    except Exception as exc:  # "database is locked" surfaces as an exception
+                        status, content = 500, str(exc).encode()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if status != 200:
+                        errors.append(content[:200])
+                connection.close()
+
+            workers = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+            user.refresh_from_db()
+            return dict(
+                percentiles(latencies),
+                rps=len(latencies) / elapsed,
+                errors=len(errors),
+                debited=(10 ** 9 - user.tokens) // settings.CHAT_MESSAGE_COST,
+                journal_mode=journal_mode,
+            )
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from chat import intent_model
+from chat.benchmarking import current_rss_mb, percentiles, training_patterns
+
+
+class Command(BaseCommand):
+    help = "Compare per-message intent inference latency and RSS: NumPy engine vs Keras."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument("--keras", action="store_true",
+                            help="Also benchmark Keras model.predict (imports TensorFlow).")
+
+    def _run(self, label, predict, messages, iterations):
+        predict(messages[0])  # warm up
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            predict(messages[i % len(messages)])
+            samples.append((time.perf_counter() - start) * 1000)
+        stats = percentiles(samples)
+        self.stdout.write(
+            f"{label:<8} p50={stats['p50']:.3f}ms p95={stats['p95']:.3f}ms p99={stats['p99']:.3f}ms "
+            f"rss={current_rss_mb():.1f}MB"
+        )
+
+    def handle(self, *args, **options):
+        messages = training_patterns()
+        self.stdout.write(f"baseline rss={current_rss_mb():.1f}MB")
+
+        bundle = intent_model.get_bundle()
+        vectorizer, network = bundle.vectorizer, bundle.network
+        self._run("numpy", lambda m: network.predict_proba(vectorizer.transform([m])),
+                  messages, options["iterations"])
+
+        if options["keras"]:
+            model = intent_model.build_keras_model(network.n_features, len(bundle.classes), bundle.weights)
+            self._run("keras", lambda m: model.predict(vectorizer.transform([m]).toarray(), verbose=0),
+                      messages, options["iterations"] // 10)
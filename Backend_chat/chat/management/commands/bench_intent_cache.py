@@ -0,0 +1,70 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from chat import intent_model
+from chat.benchmarking import percentiles, training_patterns
+from chat.intent_cache import IntentCache
+
+
+def _variant(rng, pattern):
+    """Surface variations that normalize to the same text."""
+    choice = rng.randrange(4)
+    if choice == 1:
+        return pattern.upper()
+    if choice == 2:
+        return f"  {pattern}!!"
+    if choice == 3:
+        return pattern.replace(" ", "   ") + "?"
+    return pattern
+
+
+class Command(BaseCommand):
+    help = "Replay a Zipf-distributed stream of training patterns with and without the intent cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20000)
+        parser.add_argument("--zipf", type=float, default=1.2, help="Zipf exponent (> 1).")
+        parser.add_argument("--max-entries", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _replay(self, label, predict, stream):
+        samples = []
+        started = time.perf_counter()
+        for message in stream:
+            start = time.perf_counter()
+            predict(message)
+            samples.append((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - started
+        stats = percentiles(samples)
+        self.stdout.write(
+            f"{label:<9} {len(stream) / elapsed:>9.0f} msg/s  p50={stats['p50']:.3f}ms p99={stats['p99']:.3f}ms"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        patterns = training_patterns()
+        rng.shuffle(patterns)
+        ranks = np.random.default_rng(options["seed"]).zipf(options["zipf"], options["requests"])
+        stream = [_variant(rng, patterns[(rank - 1) % len(patterns)]) for rank in ranks]
+
+        bundle = intent_model.get_bundle()
+        self._replay("uncached", lambda m: bundle.predict([m])[0], stream)
+
+        cache = IntentCache(max_entries=options["max_entries"], name="bench_intent_cache")
+
+        def cached(message):
+            intent = cache.get(message, bundle.version)
+            if intent is None:
+                intent = bundle.predict([message])[0]
+                cache.set(message, bundle.version, intent)
+            return intent
+
+        self._replay("cached", cached, stream)
+        stats = cache.stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']} "
+            f"hit_rate={stats['hits'] / len(stream):.1%}"
+        )
@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from chat.benchmarking import landmark_objects, legacy_hand_stats
+from chat.landmarks import classify, hand_array, hands_array, pinch_distance, raised_names
+
+
+class Command(BaseCommand):
+    help = "Time finger states, gestures and pinch distance: attribute by attribute vs vectorized vs batched."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hands", type=int, default=2, help="Hands per frame.")
+        parser.add_argument("--frames", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _time(self, label, fn, hands):
+        fn()  # warm up
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<26} {elapsed * 1e6 / hands:8.2f} us/hand  {hands / elapsed:>12,.0f} hands/s")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        points = rng.random((options["frames"], options["hands"], 21, 3), dtype=np.float32)
+        # What MediaPipe hands the scripts: per-frame lists of landmark objects
+        frames = [[landmark_objects(hand) for hand in frame] for frame in points]
+        total = options["frames"] * options["hands"]
+
+        def legacy():
+            for frame in frames:
+                for hand in frame:
+                    legacy_hand_stats(hand)
+                    thumb, index = hand.landmark[4], hand.landmark[8]
+                    np.linalg.norm(np.array([index.x, index.y]) - np.array([thumb.x, thumb.y]))
+
+        def per_hand():
+            for frame in frames:
+                for hand in frame:
+                    array = hand_array(hand)
+                    up, _ = classify(array)
+                    raised_names(up)
+                    pinch_distance(array)
+
+        def per_frame():
+            for frame in frames:
+                array = hands_array(frame)
+                up, _ = classify(array)
+                pinch_distance(array)
+                for row in up:
+                    raised_names(row)
+
+        def batched():
+            classify(points)
+            pinch_distance(points)
+
+        self._time("attribute by attribute", legacy, total)
+        self._time("vectorized, per hand", per_hand, total)
+        self._time("vectorized, per frame", per_frame, total)
+        self._time("batched arrays (offline)", batched, total)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from rest_framework.authtoken.models import Token
+
+from chat.models import User
+
+
+class Command(BaseCommand):
+    help = "Requests/sec of the balance and details endpoints with and without the user cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=3000)
+
+    def _run(self, label, client, path, requests):
+        client.get(path)  # warm up (fills the cache when enabled)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = client.get(path)
+                assert response.status_code == 200, response.content
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:<28} {requests / elapsed:>8.0f} req/s  {len(queries) / requests:.2f} queries/req"
+        )
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = User.objects.create(username="bench")
+            token = Token.objects.create(user=user)
+            client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {token.key}")
+            for path in ("/api/token-balance/balance/", "/api/user-details/details/"):
+                for enabled in (False, True):
+                    with override_settings(USER_CACHE=enabled):
+                        label = f"{path.split('/')[2]} cache={'on' if enabled else 'off'}"
+                        self._run(label, client, path, options["requests"])
+        finally:
+            teardown_databases(old_config, verbosity=0)
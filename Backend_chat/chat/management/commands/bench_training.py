@@ -0,0 +1,54 @@
+import csv
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from chat import intent_model
+from chat.benchmarking import peak_rss_mb
+
+
+def write_synthetic_csv(path, rows, intents=8, words_per_intent=400, seed=0):
+    """A training CSV whose patterns are drawn from per-intent word pools."""
+    rng = random.Random(seed)
+    pools = [[f"w{intent}x{i}" for i in range(words_per_intent)] for intent in range(intents)]
+    shared = [f"common{i}" for i in range(200)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["intent", "pattern", "response"])
+        for _ in range(rows):
+            intent = rng.randrange(intents)
+            words = rng.sample(pools[intent], 4) + rng.sample(shared, 2)
+            rng.shuffle(words)
+            writer.writerow([f"intent_{intent}", " ".join(words), "ok"])
+
+
+class Command(BaseCommand):
+    help = "Train on a synthetic CSV and report wall time and peak RSS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--epochs", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=256)
+        parser.add_argument("--chunksize", type=int, default=50_000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "synthetic.csv")
+            write_synthetic_csv(path, options["rows"])
+            self.stdout.write(f"synthetic CSV: {options['rows']} rows, {os.path.getsize(path) / 2**20:.1f}MB")
+
+            import tensorflow  # noqa: F401  (count TensorFlow itself in the baseline)
+            baseline = peak_rss_mb()
+            start = time.perf_counter()
+            bundle = intent_model.train(
+                path, epochs=options["epochs"], batch_size=options["batch_size"], chunksize=options["chunksize"],
+            )
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"trained {bundle.meta['rows']} rows x {len(bundle.vocabulary)} features in {elapsed:.1f}s; "
+            f"peak rss {peak_rss_mb():.0f}MB (baseline after imports {baseline:.0f}MB)"
+        )
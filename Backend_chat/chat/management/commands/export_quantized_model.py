@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from chat import intent_model
+from chat.quantization import bundle_nbytes, compare, quantize_bundle
+
+
+class Command(BaseCommand):
+    help = "Export a pruned int8/float16 copy of an intent model bundle and report its accuracy drop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", help="Float bundle to export (default: latest).")
+        parser.add_argument("--dtype", choices=["int8", "float16"], default="int8")
+        parser.add_argument("--prune", type=float, default=0.01,
+                            help="Drop terms whose importance is below this fraction of the largest.")
+        parser.add_argument("--min-df", type=int, default=1,
+                            help="Drop terms seen in fewer training rows than this.")
+        parser.add_argument("--eval-csv",
+                            help="Labelled rows the float model was not trained on; required with --publish. "
+                                 "Without it the training CSV is used, which only measures training-set fit.")
+        parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                            help="Refuse to publish if accuracy drops by more than this.")
+        parser.add_argument("--publish", action="store_true", help="Publish the export as the latest bundle.")
+
+    def handle(self, *args, **options):
+        import pandas as pd
+
+        source = intent_model.load_bundle(options["source"])
+        if source is None:
+            raise CommandError("No intent model bundle found; run `manage.py train_intent_model` first")
+        if source.quantized:
+            raise CommandError(f"{source.version} is already quantized; pass the float --source")
+        bundle = quantize_bundle(source, options["dtype"], options["prune"], options["min_df"])
+
+        eval_csv = options["eval_csv"]
+        if eval_csv and intent_model.csv_hash(eval_csv) == source.meta.get("csv_sha256"):
+            raise CommandError("--eval-csv is the CSV the float model was trained on")
+        if options["publish"] and not eval_csv:
+            raise CommandError("--publish needs an --eval-csv the float model was not trained on")
+        rows = pd.concat(intent_model.read_chunks(eval_csv or intent_model.CSV_PATH))
+        report = compare(source, bundle, rows["pattern"].tolist(), rows["intent"].tolist())
+        bundle.meta["evaluation"] = dict(report, rows=len(rows), held_out=bool(eval_csv))
+
+        before, after = bundle_nbytes(source), bundle_nbytes(bundle)
+        self.stdout.write(f"{bundle.version}: {len(source.vocabulary)} -> {len(bundle.vocabulary)} features")
+        for key in ("arrays", "vocabulary"):
+            self.stdout.write(f"  {key:<10} {before[key] / 1024:9.1f}KB -> {after[key] / 1024:9.1f}KB "
+                              f"({before[key] / max(after[key], 1):.1f}x)")
+        self.stdout.write(
+            f"  accuracy   {report['float_accuracy']:.4f} -> {report['quantized_accuracy']:.4f} "
+            f"(drop {report['accuracy_drop']:+.4f}, agreement {report['agreement']:.4f}) "
+            f"on {len(rows)} {'eval' if eval_csv else 'training'} rows"
+        )
+        self.stdout.write(f"  batch      {report['float_ms']:.2f}ms -> {report['quantized_ms']:.2f}ms")
+
+        if options["publish"]:
+            if report["accuracy_drop"] > options["max_accuracy_drop"]:
+                raise CommandError("Accuracy drop exceeds --max-accuracy-drop; not publishing")
+            intent_model.publish(bundle)
+            self.stdout.write(self.style.SUCCESS(f"Published intent model {bundle.version}"))
@@ -0,0 +1,79 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.benchmarking import process_memory_mb
+from chat.inference_pool import InferencePool, PoolClient
+
+# Snippet run in a fresh web-worker-like process to measure its memory
+_WEB_WORKER = (
+    "from chat.views import predict_intent; predict_intent('hello'); "
+    "from chat.benchmarking import process_memory_mb; import os; "
+    "print(*process_memory_mb(os.getpid()))"
+)
+
+
+class Command(BaseCommand):
+    help = "Run pre-forked intent inference workers sharing one copy of the model weights."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=getattr(settings, "INTENT_INFERENCE_POOL", None)
+                            or os.path.join(settings.BASE_DIR, "inference.sock"))
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--report", action="store_true",
+                            help="Print a memory-per-worker report and exit instead of serving.")
+
+    def handle(self, *args, **options):
+        pool = InferencePool(options["socket"], workers=options["workers"]).start()
+        try:
+            if options["report"]:
+                self._report(pool)
+                return
+            self.stdout.write(f"Inference pool serving {pool.version} on {pool.address} with {pool.workers} workers")
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            interval = getattr(settings, "INTENT_MODEL_RELOAD_INTERVAL", 0)
+            last_check = time.monotonic()
+            while all(process.is_alive() for process in pool.processes):
+                time.sleep(1)
+                if interval and time.monotonic() - last_check >= interval:
+                    last_check = time.monotonic()
+                    try:
+                        if pool.reload():
+                            self.stdout.write(f"Reloaded workers with intent model {pool.version}")
+                    except Exception as exc:
+                        self.stderr.write(f"Intent model reload failed, keeping {pool.version}: {exc}")
+            self.stderr.write("An inference worker exited; shutting down the pool")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.stop()
+
+    def _web_worker_memory(self, **env):
+        output = subprocess.run(
+            [sys.executable, "manage.py", "shell", "-c", _WEB_WORKER],
+            cwd=settings.BASE_DIR, env=dict(os.environ, **env),
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        return float(output[-2]), float(output[-1])
+
+    def _report(self, pool):
+        client = PoolClient(pool.address)
+        for _ in range(pool.workers * 4):
+            client.predict(["hello"])
+        self.stdout.write(f"{'shared block':<22} {pool.shared.shm.size / 1024:7.1f}KB "
+                          f"(vocabulary, IDF and weights, mapped once by every worker)")
+        rss, pss = process_memory_mb(os.getpid())
+        self.stdout.write(f"{'pool parent':<22} rss={rss:7.1f}MB pss={pss:7.1f}MB")
+        for process in pool.processes:
+            rss, pss = process_memory_mb(process.pid)
+            self.stdout.write(f"{f'pool worker {process.pid}':<22} rss={rss:7.1f}MB pss={pss:7.1f}MB")
+
+        local = self._web_worker_memory(INTENT_INFERENCE_POOL="")
+        pooled = self._web_worker_memory(INTENT_INFERENCE_POOL=pool.address)
+        self.stdout.write(f"{'web worker (local)':<22} rss={local[0]:7.1f}MB pss={local[1]:7.1f}MB")
+        self.stdout.write(f"{'web worker (pool)':<22} rss={pooled[0]:7.1f}MB pss={pooled[1]:7.1f}MB")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from chat import intent_model
+
+
+class Command(BaseCommand):
+    help = "Train the intent classifier and publish a versioned artifact bundle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", default=intent_model.CSV_PATH, help="Training data CSV.")
+        parser.add_argument("--epochs", type=int, help="Defaults to 50, or 5 with --incremental.")
+        parser.add_argument("--force", action="store_true", help="Retrain even if the CSV is unchanged.")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Warm-start from the latest bundle using only new CSV rows.")
+        parser.add_argument("--include-chats", action="store_true",
+                            help="With --incremental, also learn from logged chats, labelled with the "
+                                 "intent the model predicted for them at the time.")
+
+    def handle(self, *args, **options):
+        verbose = 1 if options["verbosity"] > 1 else 0
+        if options["incremental"]:
+            bundle, trained = intent_model.update_incrementally(
+                options["csv"], epochs=options["epochs"] or 5, verbose=verbose,
+                include_chats=options["include_chats"],
+            )
+        else:
+            bundle, trained = intent_model.train_if_changed(
+                options["csv"], epochs=options["epochs"] or 50, force=options["force"], verbose=verbose,
+            )
+        if trained:
+            self.stdout.write(self.style.SUCCESS(f"Published intent model {bundle.version}"))
+        else:
+            self.stdout.write(f"No new training data; latest intent model is {bundle.version}")
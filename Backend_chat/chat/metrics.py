@@ -0,0 +1,134 @@
+import bisect
+import threading
+
+
+# --- IN-PROCESS METRICS ---
+class Histogram:
+    """A thread-safe cumulative histogram in the Prometheus style."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labels=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = dict(labels or {})
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """``{"buckets": [(le, cumulative_count), ...], "sum": ..., "count": ...}``."""
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        cumulative, running = [], 0
+        for le, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative.append((le, running))
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class Counter:
+    """A thread-safe monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = dict(labels or {})
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+# Keyed by (name, sorted label items): one series per label combination
+REGISTRY = {}
+_registry_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def histogram(name, help_text, buckets, labels=None):
+    """Get or create the process-wide histogram called ``name`` with these ``labels``."""
+    key = _key(name, labels)
+    metric = REGISTRY.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = REGISTRY.get(key)
+            if metric is None:
+                metric = REGISTRY[key] = Histogram(name, help_text, buckets, labels)
+    return metric
+
+
+def counter(name, help_text, labels=None):
+    """Get or create the process-wide counter called ``name`` with these ``labels``."""
+    key = _key(name, labels)
+    metric = REGISTRY.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = REGISTRY.get(key)
+            if metric is None:
+                metric = REGISTRY[key] = Counter(name, help_text, labels)
+    return metric
+
+
+# --- PROMETHEUS TEXT FORMAT ---
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registry=None):
+    """Every metric in ``registry`` in the Prometheus text exposition format."""
+    registry = REGISTRY if registry is None else registry
+    families = {}
+    for metric in list(registry.values()):
+        families.setdefault(metric.name, []).append(metric)
+    lines = []
+    for name in sorted(families):
+        series = families[name]
+        lines.append(f"# HELP {name} {series[0].help_text}")
+        lines.append(f"# TYPE {name} {series[0].kind}")
+        for metric in series:
+            if metric.kind == "counter":
+                lines.append(f"{name}{_labels(metric.labels)} {_number(metric.value)}")
+                continue
+            snapshot = metric.snapshot()
+            for le, count in snapshot["buckets"]:
+                lines.append(f"{name}_bucket{_labels(metric.labels, le=_number(le))} {count}")
+            lines.append(f"{name}_sum{_labels(metric.labels)} {_number(snapshot['sum'])}")
+            lines.append(f"{name}_count{_labels(metric.labels)} {snapshot['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_alter_user_options_alter_user_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chat',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='chat_user_ts_id_idx'),
+        ),
+    ]
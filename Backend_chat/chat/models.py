@@ -10,3 +10,9 @@ class Chat(models.Model):
     message = models.TextField()
     response = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of a user's history (see ChatViewSet.history)
+            models.Index(fields=['user', 'timestamp', 'id'], name='chat_user_ts_id_idx'),
+        ]
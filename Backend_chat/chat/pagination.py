@@ -0,0 +1,39 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# --- KEYSET (CURSOR) PAGINATION ---
+# Pages are ordered newest first on (timestamp, id). The cursor is the
+# position of the last row of the previous page, so each page is a bounded
+# index range scan instead of an OFFSET that grows with the page number.
+
+def encode_cursor(obj):
+    raw = f"{obj.timestamp.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``(timestamp, id)`` for a cursor, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, pk = raw.rsplit("|", 1)
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError(cursor)
+        return parsed, int(pk)
+    except (binascii.Error, UnicodeError) as exc:
+        raise ValueError(cursor) from exc
+
+
+def keyset_page(queryset, cursor=None, limit=20):
+    """Return ``(rows, next_cursor)`` for one page of ``queryset``, newest first."""
+    queryset = queryset.order_by("-timestamp", "-id")
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    rows = list(queryset[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
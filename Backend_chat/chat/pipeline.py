@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# --- LATEST-WINS HANDOFF ---
+class Packet:
+    """A frame travelling through the pipeline, with its timestamps."""
+
+    __slots__ = ("index", "frame", "result", "captured_at", "queued_at")
+
+    def __init__(self, index, frame):
+        self.index = index
+        self.frame = frame
+        self.result = None
+        self.captured_at = time.perf_counter()
+        self.queued_at = self.captured_at
+
+
+class LatestSlot:
+    """A size-1 queue where ``put`` replaces an item nobody has taken yet.
+
+    The consumer always gets the freshest frame; replaced ones are counted in
+    ``dropped`` instead of piling up behind a slow stage.
+    """
+
+    def __init__(self):
+        self.dropped = 0
+        self._item = None
+        self._closed = False
+        self._ready = threading.Condition()
+
+    def put(self, packet):
+        packet.queued_at = time.perf_counter()
+        with self._ready:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = packet
+            self._ready.notify()
+
+    def get(self, timeout=None):
+        """The newest packet, or None once the slot is closed and empty (or on timeout)."""
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._item is not None or self._closed, timeout):
+                return None
+            packet, self._item = self._item, None
+            return packet
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+class StageStats:
+    """Frames handled by a stage, its throughput, and how long frames waited for it."""
+
+    def __init__(self, name, window=1000):
+        self.name = name
+        self.frames = 0
+        self.dropped = 0
+        self.started = None
+        self.finished = None
+        self.queue_ms = deque(maxlen=window)
+        self.busy_ms = deque(maxlen=window)
+
+    def record(self, queue_seconds, busy_seconds):
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now - busy_seconds
+        self.finished = now
+        self.frames += 1
+        self.queue_ms.append(queue_seconds * 1000)
+        self.busy_ms.append(busy_seconds * 1000)
+
+    @property
+    def fps(self):
+        if not self.frames or self.finished <= self.started:
+            return 0.0
+        return self.frames / (self.finished - self.started)
+
+    def summary(self):
+        queue_p50, queue_p95 = np.percentile(self.queue_ms, [50, 95]) if self.queue_ms else (0.0, 0.0)
+        busy = float(np.mean(self.busy_ms)) if self.busy_ms else 0.0
+        return {
+            "frames": self.frames, "dropped": self.dropped, "fps": self.fps,
+            "queue_p50_ms": float(queue_p50), "queue_p95_ms": float(queue_p95), "busy_ms": busy,
+        }
+
+
+# --- SOURCES ---
+class VideoSource:
+    """Frames from a camera index or a video file through OpenCV.
+
+    Files are paced at their own frame rate by default so they behave like a
+    camera (and stale-frame dropping is exercised); ``pace=False`` reads them
+    as fast as possible. ``read`` returns None at the end of the stream.
+    """
+
+    def __init__(self, source=0, pace=None, flip=False):
+        import cv2
+
+        self.capture = cv2.VideoCapture(source)
+        self.flip = flip
+        self._cv2 = cv2
+        is_file = not isinstance(source, int)
+        fps = self.capture.get(cv2.CAP_PROP_FPS) if is_file else 0
+        self.interval = 1.0 / fps if (pace if pace is not None else is_file) and fps > 0 else 0.0
+        self._next = None
+
+    def read(self):
+        if self.interval:
+            now = time.perf_counter()
+            self._next = self._next or now
+            if self._next > now:
+                time.sleep(self._next - now)
+            self._next += self.interval
+        ok, frame = self.capture.read()
+        if not ok:
+            return None
+        return self._cv2.flip(frame, 1) if self.flip else frame
+
+    def close(self):
+        self.capture.release()
+
+
+# --- PIPELINE ---
+class Pipeline:
+    """Capture, inference and render stages on their own threads, joined by ``LatestSlot``s.
+
+    ``read()`` returns the next frame or None when the source is exhausted;
+    ``infer(frame)`` returns a result and ``render(frame, result)`` may return
+    False to stop. Capture and inference run in background threads; render
+    runs on the thread calling ``run`` because GUI toolkits (``cv2.imshow``)
+    want the main thread. A slow stage only ever sees the newest frame.
+    """
+
+    def __init__(self, read, infer, render):
+        self.read = read
+        self.infer = infer
+        self.render = render
+        self.stats = {name: StageStats(name) for name in ("capture", "inference", "render")}
+        self.latency_ms = deque(maxlen=1000)
+        self.error = None
+        self._to_infer = LatestSlot()
+        self._to_render = LatestSlot()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _guard(self, target, output):
+        try:
+            target()
+        except BaseException as exc:
+            self.error = self.error or exc
+            self.stop()
+        finally:
+            output.close()
+
+    def _capture(self):
+        stats, index = self.stats["capture"], 0
+        while not self._stopping.is_set():
+            started = time.perf_counter()
+            frame = self.read()
+            if frame is None:
+                break
+            self._to_infer.put(Packet(index, frame))
+            stats.record(0.0, time.perf_counter() - started)
+            index += 1
+
+    def _inference(self):
+        stats = self.stats["inference"]
+        while not self._stopping.is_set():
+            packet = self._to_infer.get()
+            if packet is None:
+                break
+            started = time.perf_counter()
+            packet.result = self.infer(packet.frame)
+            stats.record(started - packet.queued_at, time.perf_counter() - started)
+            self._to_render.put(packet)
+
+    def run(self):
+        """Run until the source ends, ``render`` returns False or ``stop()``; returns ``report()``."""
+        threads = [
+            threading.Thread(target=self._guard, args=(self._capture, self._to_infer), name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._guard, args=(self._inference, self._to_render), name="pipeline-inference", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        stats = self.stats["render"]
+        try:
+            while not self._stopping.is_set():
+                packet = self._to_render.get()
+                if packet is None:
+                    break
+                started = time.perf_counter()
+                keep_going = self.render(packet.frame, packet.result)
+                stats.record(started - packet.queued_at, time.perf_counter() - started)
+                self.latency_ms.append((time.perf_counter() - packet.captured_at) * 1000)
+                if keep_going is False:
+                    break
+        finally:
+            self.stop()
+            self._to_infer.close()
+            self._to_render.close()
+            for thread in threads:
+                thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.report()
+
+    def report(self):
+        """Per-stage summaries plus end-to-end (capture to rendered) latency percentiles."""
+        self.stats["inference"].dropped = self._to_infer.dropped
+        self.stats["render"].dropped = self._to_render.dropped
+        report = {name: stats.summary() for name, stats in self.stats.items()}
+        p50, p95 = np.percentile(self.latency_ms, [50, 95]) if self.latency_ms else (0.0, 0.0)
+        report["end_to_end"] = {"p50_ms": float(p50), "p95_ms": float(p95)}
+        return report
+
+
+def format_report(report):
+    lines = [
+        f"{name:<10} {s['fps']:6.1f} FPS  {s['frames']:5d} frames  {s['dropped']:5d} dropped  "
+        f"queue p50={s['queue_p50_ms']:.1f}ms p95={s['queue_p95_ms']:.1f}ms  busy={s['busy_ms']:.1f}ms"
+        for name, s in report.items() if name != "end_to_end"
+    ]
+    latency = report["end_to_end"]
+    lines.append(f"end-to-end latency p50={latency['p50_ms']:.1f}ms p95={latency['p95_ms']:.1f}ms")
+    return "\n".join(lines)
@@ -0,0 +1,181 @@
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# --- SAMPLING PROFILER ---
+# A background thread snapshots the stacks of the target threads every
+# ``interval`` seconds via sys._current_frames(). Nothing is hooked into the
+# interpreter, so code runs at full speed whenever no sampler is active.
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    """Count collapsed call stacks of some (or all) threads until stopped."""
+
+    def __init__(self, interval=0.001, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = None if thread_ids is None else set(thread_ids)
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format, ready for flamegraph.pl or speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_dir():
+    return str(getattr(settings, "PROFILING_DIR", None) or os.path.join(settings.MEDIA_ROOT, "profiles"))
+
+
+def profile_path(label):
+    """A new file name under ``profile_dir()`` for a profile described by ``label``."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    label = re.sub(r"[^\w.-]+", "_", label).strip("_") or "root"
+    return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{label}.collapsed")
+
+
+def write_profile(sampler, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(sampler.collapsed())
+    return path
+
+
+_worker_lock = threading.Lock()
+
+
+def profile_worker(seconds, interval=None):
+    """Sample every thread of this process for ``seconds`` in the background.
+
+    Returns the path the profile will be written to, or None if a worker
+    profile is already running.
+    """
+    if not _worker_lock.acquire(blocking=False):
+        return None
+    interval = interval or getattr(settings, "PROFILING_INTERVAL", 0.001)
+    path = profile_path(f"worker-{seconds:g}s")
+    sampler = StackSampler(interval).start()
+
+    def finish():
+        try:
+            time.sleep(seconds)
+            sampler.stop()
+            write_profile(sampler, path)
+        finally:
+            _worker_lock.release()
+
+    threading.Thread(target=finish, name="worker-profile", daemon=True).start()
+    return path
+
+
+# --- MIDDLEWARE ---
+class ProfilingMiddleware:
+    """Profile a request, or the whole worker for a while, on demand.
+
+    Only active when PROFILING_TOKEN is set; otherwise Django drops the
+    middleware at startup. A request carrying ``X-Profile: <token>`` is
+    sampled and answered with the profile's file name in ``X-Profile-File``. Adding
+    ``X-Profile-Seconds: N`` samples every thread of the worker for N seconds
+    instead, in the background.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.token = getattr(settings, "PROFILING_TOKEN", None)
+        if not self.token:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.interval = getattr(settings, "PROFILING_INTERVAL", 0.001)
+        self.max_seconds = getattr(settings, "PROFILING_MAX_SECONDS", 60)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _requested(self, request):
+        header = request.headers.get("X-Profile")
+        return header is not None and hmac.compare_digest(header.encode(), self.token.encode())
+
+    def _worker_seconds(self, request):
+        try:
+            seconds = float(request.headers.get("X-Profile-Seconds", 0))
+        except ValueError:
+            return 0
+        return min(max(seconds, 0), self.max_seconds)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._requested(request):
+            return self.get_response(request)
+        seconds = self._worker_seconds(request)
+        if seconds:
+            return self._worker(seconds, self.get_response(request))
+        sampler = StackSampler(self.interval, [threading.get_ident()]).start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        return self._attach(response, sampler, request)
+
+    async def __acall__(self, request):
+        if not self._requested(request):
+            return await self.get_response(request)
+        seconds = self._worker_seconds(request)
+        if seconds:
+            return self._worker(seconds, await self.get_response(request))
+        # Sync views run in executor threads under ASGI, so sample them all
+        sampler = StackSampler(self.interval).start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        return self._attach(response, sampler, request)
+
+    def _attach(self, response, sampler, request):
+        path = write_profile(sampler, profile_path(request.path))
+        response["X-Profile-File"] = os.path.basename(path)
+        response["X-Profile-Samples"] = str(sampler.samples)
+        return response
+
+    def _worker(self, seconds, response):
+        path = profile_worker(seconds, self.interval)
+        response["X-Profile-File"] = os.path.basename(path) if path else "busy"
+        return response
@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+
+from .inference import quantize_kernel
+from .intent_model import IntentBundle
+
+
+# --- PRUNING ---
+def feature_importance(bundle):
+    """How much each vocabulary term can move the first layer: ``idf * max |kernel row|``."""
+    kernel = np.abs(np.asarray(bundle.weights[0], dtype=np.float32))
+    return bundle.idf * kernel.max(axis=1)
+
+
+def kept_features(bundle, prune=0.01, min_df=1):
+    """Indices of the terms to keep, in their current order.
+
+    Drops terms whose importance is below ``prune`` times the largest one and,
+    when document frequencies were recorded, terms seen in fewer than
+    ``min_df`` training rows.
+    """
+    importance = feature_importance(bundle)
+    keep = importance >= prune * importance.max()
+    if bundle.document_frequency is not None:
+        keep &= bundle.document_frequency >= min_df
+    if not keep.any():
+        keep[np.argmax(importance)] = True
+    return np.flatnonzero(keep)
+
+
+# --- EXPORT ---
+def quantize_bundle(bundle, dtype="int8", prune=0.01, min_df=1):
+    """A serving-only copy of ``bundle`` with a pruned vocabulary and int8/float16 kernels.
+
+    Biases stay float32. Document frequencies and row hashes are left out, so
+    incremental training goes back to the float bundle named in
+    ``meta["source_version"]``.
+    """
+    keep = kept_features(bundle, prune, min_df)
+    terms = sorted(bundle.vocabulary, key=bundle.vocabulary.get)
+    vocabulary = {terms[old]: new for new, old in enumerate(keep.tolist())}
+
+    weights, scales = [], []
+    for i in range(0, len(bundle.weights), 2):
+        kernel = bundle.weights[i][keep] if i == 0 else bundle.weights[i]
+        quantized, scale = quantize_kernel(kernel, dtype)
+        weights += [quantized, np.asarray(bundle.weights[i + 1], dtype=np.float32)]
+        scales.append(scale)
+
+    meta = {
+        key: value for key, value in bundle.meta.items()
+        if key in ("csv_sha256", "rows", "epochs", "batch_size", "created_at")
+    }
+    meta.update(
+        source_version=bundle.version,
+        quantization={"dtype": dtype, "prune": prune, "min_df": min_df},
+        features=len(vocabulary),
+        source_features=len(bundle.vocabulary),
+    )
+    return IntentBundle(
+        f"{bundle.version}-{dtype}", vocabulary, bundle.idf[keep].astype(np.float32), bundle.classes,
+        weights, meta, scales=scales if dtype == "int8" else None,
+    )
+
+
+# --- REPORT ---
+def bundle_nbytes(bundle):
+    """Approximate in-memory size of a bundle's arrays and vocabulary dict."""
+    import sys
+
+    arrays = sum(np.asarray(a).nbytes for a in [bundle.idf, *bundle.weights, *(bundle.scales or [])])
+    vocabulary = sys.getsizeof(bundle.vocabulary) + sum(sys.getsizeof(t) for t in bundle.vocabulary)
+    return {"arrays": arrays, "vocabulary": vocabulary}
+
+
+def compare(reference, candidate, patterns, intents, repeats=5):
+    """Accuracy, agreement and batch latency of ``candidate`` against ``reference``."""
+    report = {}
+    predictions = {}
+    for name, bundle in (("float", reference), ("quantized", candidate)):
+        bundle.predict(patterns[:1])  # build the vectorizer and network
+        start = time.perf_counter()
+        for _ in range(repeats):
+            labels = bundle.predict(patterns)
+        report[f"{name}_ms"] = (time.perf_counter() - start) * 1000 / repeats
+        report[f"{name}_accuracy"] = float(np.mean(np.array(labels) == np.asarray(intents)))
+        predictions[name] = labels
+    report["accuracy_drop"] = report["float_accuracy"] - report["quantized_accuracy"]
+    report["agreement"] = float(np.mean(np.array(predictions["float"]) == np.array(predictions["quantized"])))
+    return report
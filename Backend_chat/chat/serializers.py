@@ -13,3 +13,10 @@ class ChatSerializer(serializers.ModelSerializer):
         model = Chat
         fields = ['id', 'user', 'message', 'response', 'timestamp']
         read_only_fields = ['user', 'response', 'timestamp']
+
+class ChatPreviewSerializer(ChatSerializer):
+    message_preview = serializers.CharField(read_only=True)
+    response_preview = serializers.CharField(read_only=True)
+
+    class Meta(ChatSerializer.Meta):
+        fields = ['id', 'user', 'message_preview', 'response_preview', 'timestamp']
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    user_cache.forget_token(instance.key)
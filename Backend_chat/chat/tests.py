@@ -1,3 +1,980 @@
-from django.test import TestCase
+import asyncio
+import gc
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import intent_model
+from .accounting import _update_returning_supported, debit_tokens
+from .batching import MicroBatcher
+from .chat_log import ChatWriter, save_chat
+from .cursor import ClickDetector, CursorActuator, OneEuroFilter, RecordingBackend
+from .emotion import EmotionWorker, box_shift, crop_face
+from .events import broker
+from .inference import quantize_kernel
+from .inference_pool import InferencePool, PoolClient, share_bundle
+from .instrumentation import span
+from .intent_model import ModelHolder
+from .intent_cache import IntentCache, normalize
+from .landmarks import classify, fingers_up, gesture_ids, gestures, hand_array, hands_array, pinch_distance, raised_names
+from .models import Chat, User
+from .pipeline import LatestSlot, Packet, Pipeline
+from .profiling import StackSampler
+from .quantization import quantize_bundle
+from .voice import StubBackend, VoiceListener
+from .benchmarking import landmark_objects, legacy_hand_stats, training_patterns
+
+
+def make_bundle(n_classes=3, seed=0):
+    """A bundle with the real TF-IDF vocabulary and random multi-class weights."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer().fit(training_patterns())
+    rng = np.random.default_rng(seed)
+    sizes = [len(vectorizer.vocabulary_), 16, 16, n_classes]
+    weights = []
+    for n_in, n_out in zip(sizes, sizes[1:]):
+        weights += [rng.normal(size=(n_in, n_out)).astype(np.float32),
+                    rng.normal(size=n_out).astype(np.float32)]
+    vocabulary = {term: int(i) for term, i in vectorizer.vocabulary_.items()}
+    classes = [f"intent_{i}" for i in range(n_classes)]
+    return intent_model.IntentBundle("test", vocabulary, vectorizer.idf_, classes, weights)
+
+
+class IntentModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(INTENT_MODEL_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_bundle_round_trip_and_retrain_only_on_csv_change(self):
+        bundle, trained = intent_model.train_if_changed(epochs=2)
+        self.assertTrue(trained)
+        self.assertEqual(intent_model.latest_version(), bundle.version)
+
+        again, trained = intent_model.train_if_changed(epochs=2)
+        self.assertFalse(trained)
+        self.assertEqual(again.version, bundle.version)
+
+        loaded = intent_model.load_bundle()
+        self.assertEqual(loaded.meta["csv_sha256"], intent_model.csv_hash())
+        self.assertEqual(loaded.classes, bundle.classes)
+        self.assertEqual(loaded.predict(["Hello"]), bundle.predict(["Hello"]))
+
+
+class NumpyInferenceTests(SimpleTestCase):
+    def test_forward_pass_matches_keras(self):
+        bundle = make_bundle()
+        messages = training_patterns() + ["something completely unseen"]
+        model = intent_model.build_keras_model(bundle.network.n_features, len(bundle.classes), bundle.weights)
+        expected = model.predict(bundle.vectorizer.transform(messages).toarray(), verbose=0)
+
+        actual = bundle.predict_proba(messages)
+        np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+        self.assertEqual(bundle.predict(messages), [bundle.classes[i] for i in expected.argmax(axis=1)])
+
+
+class QuantizationTests(SimpleTestCase):
+    def test_int8_kernel_error_is_bounded_per_unit(self):
+        kernel = np.random.default_rng(0).normal(size=(50, 16)).astype(np.float32)
+        quantized, scales = quantize_kernel(kernel, "int8")
+        self.assertEqual(quantized.dtype, np.int8)
+        error = np.abs(quantized * scales - kernel).max(axis=0)
+        self.assertTrue(np.all(error <= scales / 2 + 1e-6))
+
+    def test_pruned_int8_bundle_round_trips_and_agrees(self):
+        bundle = make_bundle()
+        bundle.document_frequency = np.full(len(bundle.vocabulary), 5)
+        rare = bundle.vocabulary["hello"]
+        bundle.document_frequency[rare] = 1
+
+        quantized = quantize_bundle(bundle, "int8", prune=0.0, min_df=2)
+        self.assertNotIn("hello", quantized.vocabulary)
+        self.assertEqual(len(quantized.vocabulary), len(bundle.vocabulary) - 1)
+        self.assertEqual(sorted(quantized.vocabulary.values()), list(range(len(quantized.vocabulary))))
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        quantized.save(tmp.name)
+        loaded = intent_model.IntentBundle.load(tmp.name)
+        self.assertTrue(loaded.quantized)
+        self.assertEqual(loaded.weights[0].dtype, np.int8)
+        self.assertEqual(loaded.meta["source_version"], "test")
+
+        messages = [m for m in training_patterns() if "hello" not in m.lower()]
+        # The per-message gather path and the batch matmul path agree
+        batch = loaded.predict_proba(messages)
+        single = np.vstack([loaded.predict_proba([m]) for m in messages])
+        np.testing.assert_allclose(batch, single, rtol=1e-5, atol=1e-6)
+        reference = bundle.predict_proba(messages)
+        np.testing.assert_allclose(batch, reference, atol=0.05)
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_concurrent_submissions_share_batches(self):
+        batches = []
+
+        def handler(items):
+            batches.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait=0.05, name="test")
+        results = {}
+        barrier = threading.Barrier(20)
+
+        def worker(n):
+            barrier.wait()
+            results[n] = batcher.submit(n)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {n: n * 2 for n in range(20)})
+        self.assertEqual(sum(batches), 20)
+        self.assertLessEqual(max(batches), 8)
+        self.assertLess(len(batches), 20)
+        self.assertEqual(batcher.batch_size.snapshot()["count"], len(batches))
+
+    def test_handler_errors_reach_every_caller(self):
+        def handler(items):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher(handler, max_wait=0, name="test_errors")
+        with self.assertRaises(ValueError):
+            batcher.submit("x")
+
+
+@mock.patch("chat.views.predict_intent", return_value="greeting")
+class SendMessageConcurrencyTests(TransactionTestCase):
+    def test_parallel_sends_debit_exactly(self, _predict):
+        user = User.objects.create(username="stress", tokens=100 * 150)
+        token = Token.objects.create(user=user)
+        requests, ok, errors = 300, [], []
+        barrier = threading.Barrier(requests)
+
+        def send():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+            barrier.wait()
+            try:
+                response = client.post("/api/chat/send_message/", {"message": "hi"}, format="json")
+                (ok if response.status_code == 200 else errors).append(response)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send) for _ in range(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        user.refresh_from_db()
+        self.assertEqual(len(ok), 150)
+        self.assertEqual(user.tokens, 0)
+        self.assertEqual(Chat.objects.filter(user=user).count(), 150)
+        self.assertTrue(all(r.data == {"error": "Insufficient tokens"} for r in errors))
+        self.assertEqual(sorted(r.data["remaining_tokens"] for r in ok), list(range(0, 15000, 100)))
+
+
+class DebitTokensTests(TestCase):
+    def test_update_returning_and_fallback_agree(self):
+        user = User.objects.create(username="debit", tokens=10)
+        self.assertEqual(debit_tokens(user.pk, 4), 6)
+        with mock.patch("chat.accounting._update_returning_supported", return_value=False):
+            self.assertEqual(debit_tokens(user.pk, 4), 2)
+            self.assertIsNone(debit_tokens(user.pk, 4))
+        self.assertIsNone(debit_tokens(user.pk, 4))
+        user.refresh_from_db()
+        self.assertEqual(user.tokens, 2)
+
+    def test_only_postgresql_and_new_sqlite_use_returning(self):
+        self.assertEqual(_update_returning_supported(), connection.Database.sqlite_version_info >= (3, 35))
+        with mock.patch.object(type(connections["default"]), "vendor", "mysql"):
+            self.assertFalse(_update_returning_supported())
+
+
+class SqlitePragmaTests(TransactionTestCase):
+    def test_connections_use_wal(self):
+        connection.close()
+        with connection.cursor() as cursor:
+            self.assertEqual(cursor.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(cursor.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+
+class ChatWriterTests(TransactionTestCase):
+    def test_buffered_rows_are_flushed_in_batches_and_on_close(self):
+        user = User.objects.create(username="writer")
+        writer = ChatWriter(batch_size=100, flush_interval=0.05, max_pending=1000)
+        for i in range(250):
+            writer.record(user.pk, f"message {i}", "response")
+        writer.flush()
+        self.assertEqual(Chat.objects.filter(user=user).count(), 250)
+
+        writer.record(user.pk, "last", "response")
+        writer.close()
+        self.assertTrue(Chat.objects.filter(user=user, message="last").exists())
+
+    def test_failed_batch_is_retried(self):
+        user = User.objects.create(username="retry")
+        writer = ChatWriter(batch_size=10, flush_interval=0.05, retries=2)
+        self.addCleanup(writer.close)
+        real_bulk_create = Chat.objects.bulk_create
+        failures = [OperationalError("database is locked")]
+
+        def flaky_bulk_create(rows):
+            if failures:
+                raise failures.pop()
+            return real_bulk_create(rows)
+
+        with mock.patch.object(Chat.objects, "bulk_create", side_effect=flaky_bulk_create):
+            writer.record(user.pk, "hello", "response")
+            writer.flush()
+        self.assertTrue(Chat.objects.filter(user=user, message="hello").exists())
+        self.assertEqual(writer.failed_rows.value, 0)
+
+    @override_settings(CHAT_WRITE_BEHIND=True)
+    def test_rows_are_queued_only_after_commit(self):
+        user = User.objects.create(username="on-commit")
+        writer = ChatWriter(flush_interval=0.05)
+        self.addCleanup(writer.close)
+        with mock.patch("chat.chat_log.get_chat_writer", return_value=writer):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                save_chat(user, "rolled back", "response")
+                raise RuntimeError
+            with transaction.atomic():
+                save_chat(user, "committed", "response")
+                self.assertEqual(writer._queue.qsize(), 0)
+            writer.flush()
+        self.assertEqual(list(Chat.objects.filter(user=user).values_list("message", flat=True)), ["committed"])
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], ALLOWED_HOSTS=["localhost"],
+                   USER_CACHE=True)
+class BenchHarnessTests(TransactionTestCase):
+    # No model is loaded or trained: send_message gets a canned intent
+    @mock.patch("chat.views.predict_intent", return_value="greeting")
+    @mock.patch("chat.management.commands.bench.get_bundle")
+    def test_run_benchmark_reports_every_endpoint(self, _get_bundle, _predict):
+        from .management.commands.bench import ENDPOINTS, compare, run_benchmark
+
+        results = run_benchmark("wsgi", users=2, requests=4)
+        self.assertEqual(set(results), set(ENDPOINTS))
+        for stats in results.values():
+            self.assertEqual(stats["failures"], 0)
+            self.assertLessEqual(stats["p50"], stats["p99"])
+        # Registration inserts the user and its token; balance is served from the user cache
+        self.assertGreaterEqual(results["register"]["queries_per_request"], 2)
+        self.assertEqual(results["balance"]["queries_per_request"], 0)
+
+        slower = {"endpoints": {"balance": dict(results["balance"], p95=results["balance"]["p95"] / 2)}}
+        lines, regressed = compare(slower, results, threshold=10)
+        self.assertTrue(regressed)
+        self.assertIn("REGRESSION", lines[0])
+
+
+@override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=True, METRICS_TOKEN="scrape")
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="timed", tokens=1000)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    @mock.patch("chat.views.predict_intent", return_value="greeting")
+    def test_server_timing_has_stages_and_db(self, _predict):
+        response = self.client.post("/api/chat/send_message/", {"message": "hi"}, format="json")
+        timings = dict(part.split(";", 1) for part in response["Server-Timing"].split(", "))
+        self.assertTrue({"auth", "debit", "chat_insert", "db", "total"} <= set(timings))
+        # debit UPDATE ... RETURNING and the Chat INSERT at least
+        queries = int(timings["db"].split('desc="')[1].split()[0])
+        self.assertGreaterEqual(queries, 2)
+
+        metrics = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer scrape").content.decode()
+        self.assertIn('http_request_stage_seconds_count{view="chat-send-message",stage="debit"}', metrics)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", metrics)
+        self.assertRegex(metrics, r'http_request_db_queries_bucket\{view="chat-send-message",le="\+Inf"\} [1-9]')
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_skip_breakdown_and_metrics_need_token(self):
+        response = self.client.get("/api/token-balance/balance/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer scrape")
+        self.assertIn('view="token-balance-balance"', response.content.decode())
+
+    @override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=False, METRICS_TOKEN=None)
+    def test_metrics_and_server_timing_are_off_without_opt_in(self):
+        response = self.client.get("/api/token-balance/balance/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+
+class ProfilingTests(SimpleTestCase):
+    def test_sampler_sees_busy_function(self):
+        def spin(until):
+            while time.perf_counter() < until:
+                pass
+
+        sampler = StackSampler(0.001, [threading.get_ident()]).start()
+        spin(time.perf_counter() + 0.1)
+        sampler.stop()
+        self.assertGreater(sampler.samples, 10)
+        self.assertIn("chat.tests:spin", sampler.collapsed())
+
+    def test_middleware_writes_profile_only_with_token(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with self.settings(PROFILING_TOKEN="secret", PROFILING_DIR=tmp.name):
+            client = APIClient()
+            response = client.get("/metrics")
+            self.assertNotIn("X-Profile-File", response)
+            response = client.get("/metrics", HTTP_X_PROFILE="wrong")
+            self.assertNotIn("X-Profile-File", response)
+
+            response = client.get("/metrics", HTTP_X_PROFILE="secret")
+            path = f"{tmp.name}/{response['X-Profile-File']}"
+            self.assertTrue(path.endswith("-metrics.collapsed"))
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+
+class EmotionWorkerTests(SimpleTestCase):
+    def test_crop_is_clipped_copy_of_face(self):
+        frame = np.arange(100 * 200 * 3, dtype=np.uint8).reshape(100, 200, 3)
+        face = crop_face(frame, (0.9, 0.5, 0.2, 0.2), margin=0)
+        self.assertEqual(face.shape, (20, 20, 3))
+        face[:] = 0
+        self.assertTrue(frame[50:70, 180:].any())
+        self.assertAlmostEqual(box_shift((0, 0, 1, 1), (0, 0, 1, 1)), 0.0)
+        self.assertAlmostEqual(box_shift((0, 0, 1, 1), (0, 0, 0.5, 1)), 0.5)
+
+    def test_submissions_are_throttled_and_dropped_while_busy(self):
+        release = threading.Event()
+        shapes = []
+
+        def analyze(face):
+            shapes.append(face.shape)
+            release.wait(5)
+            return "happy"
+
+        worker = EmotionWorker(analyze, rate=2.0, min_shift=0.3, margin=0)
+        self.addCleanup(worker.stop)
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        box = (0.1, 0.1, 0.5, 0.5)
+        self.assertFalse(worker.submit(frame, [], now=0.0))
+        self.assertTrue(worker.submit(frame, [box], now=0.0))
+        self.assertFalse(worker.submit(frame, [box], now=1.0))  # still analysing
+        release.set()
+        while worker.mood is None:
+            time.sleep(0.01)
+        self.assertEqual(worker.current(), "happy")
+        self.assertEqual(shapes, [(50, 50, 3)])
+
+        self.assertFalse(worker.submit(frame, [box], now=0.2))  # too soon, same face
+        self.assertTrue(worker.submit(frame, [(0.5, 0.5, 0.4, 0.4)], now=0.3))  # face moved
+
+
+class PipelineTests(SimpleTestCase):
+    def frames(self, count, interval=0.002):
+        source = iter(range(count))
+
+        def read():
+            time.sleep(interval)
+            return next(source, None)
+
+        return read
+
+    def test_latest_slot_keeps_newest(self):
+        slot = LatestSlot()
+        for i in range(3):
+            slot.put(Packet(i, None))
+        self.assertEqual(slot.get().index, 2)
+        self.assertEqual(slot.dropped, 2)
+        slot.close()
+        self.assertIsNone(slot.get())
+
+    def test_slow_inference_drops_stale_frames(self):
+        rendered = []
+
+        def infer(frame):
+            time.sleep(0.01)
+            return frame * 2
+
+        report = Pipeline(self.frames(100), infer, lambda frame, result: rendered.append(result)).run()
+        self.assertEqual(report["capture"]["frames"], 100)
+        self.assertGreater(report["inference"]["dropped"], 50)
+        self.assertEqual(report["inference"]["frames"] + report["inference"]["dropped"], 100)
+        self.assertEqual(rendered, sorted(rendered))
+        self.assertEqual(rendered[-1], 198)  # the last frame is never dropped
+        self.assertLess(report["end_to_end"]["p95_ms"], 100)
+
+    def test_render_can_stop_and_errors_propagate(self):
+        report = Pipeline(self.frames(1000), lambda frame: frame, lambda frame, result: result < 5).run()
+        self.assertLess(report["capture"]["frames"], 1000)
+
+        def infer(frame):
+            raise ValueError("bad frame")
+
+        with self.assertRaises(ValueError):
+            Pipeline(self.frames(10), infer, lambda frame, result: None).run()
+
+
+class VoiceListenerTests(SimpleTestCase):
+    def test_commands_arrive_on_queue_without_blocking_poll(self):
+        backend = StubBackend(["Open Notepad", "", "open chrome"], delay=0.05)
+        listener = VoiceListener(backend).start()
+        self.addCleanup(listener.stop)
+
+        started = time.perf_counter()
+        self.assertEqual(listener.poll(), [])
+        self.assertLess(time.perf_counter() - started, 0.01)
+
+        commands, deadline = [], time.monotonic() + 5
+        while len(commands) < 2 and time.monotonic() < deadline:
+            commands += listener.poll()
+            time.sleep(0.01)
+        self.assertEqual(commands, ["open notepad", "open chrome"])
+        self.assertEqual(backend.calibrations, 1)
+
+
+class CursorTests(SimpleTestCase):
+    def test_jittery_pinch_clicks_once_and_second_pinch_double_clicks(self):
+        clicks = ClickDetector(press=0.05, release=0.07, debounce=0.03, double_click=0.3)
+        pinch = [0.1, 0.045, 0.055, 0.04, 0.048, 0.06, 0.045, 0.1]
+        events = [clicks.update(d, i / 60) for i, d in enumerate(pinch)]
+        self.assertEqual([e for e in events if e], ["click"])
+        events = [clicks.update(d, 0.2 + i / 60) for i, d in enumerate(pinch)]
+        self.assertEqual([e for e in events if e], ["double_click"])
+        events = [clicks.update(d, 0.4 + i / 60) for i, d in enumerate(pinch)]
+        self.assertEqual([e for e in events if e], ["click"])
+
+    def test_one_euro_filter_smooths_still_hand_and_follows_moves(self):
+        noise = np.random.default_rng(0).normal(0, 5, 120)
+        smooth = OneEuroFilter(min_cutoff=1.0, beta=0.02)
+        filtered = [smooth(500 + n, i / 60) for i, n in enumerate(noise)]
+        self.assertLess(np.std(filtered[30:]), np.std(noise) / 2)
+        for i in range(120, 180):
+            position = smooth(500 + 20 * (i - 119), i / 60)
+        self.assertGreater(position, 500 + 20 * 60 - 100)
+
+    def test_actuator_coalesces_moves_and_keeps_clicks(self):
+        backend = RecordingBackend(1000, 1000)
+        cursor = CursorActuator(backend, rate=20)
+        self.addCleanup(cursor.stop)
+        for i in range(50):
+            cursor.update(i / 100, 0.5, 0.1, t=i / 1000)
+        cursor.update(0.5, 0.5, 0.01, t=0.1)
+        cursor.update(0.5, 0.5, 0.01, t=0.14)  # held past the debounce
+        deadline = time.monotonic() + 5
+        while "click" not in [call[1] for call in backend.calls] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        calls = [call[1] for call in backend.calls]
+        self.assertIn("click", calls)
+        self.assertLess(calls.count("move"), 10)
+
+
+class LandmarkTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(os.path.dirname(__file__), "testdata", "hand_landmarks.json"), encoding="utf-8") as f:
+            cls.hands = json.load(f)["hands"]
+        cls.points = np.array([hand["landmarks"] for hand in cls.hands], dtype=np.float32)
+
+    def test_golden_fixtures(self):
+        up, _ = classify(self.points)
+        np.testing.assert_array_equal(up, fingers_up(self.points))
+        self.assertEqual(gestures(self.points), [hand["gesture"] for hand in self.hands])
+        self.assertEqual([raised_names(row) for row in up],
+                         [", ".join(hand["raised"]) or "No Fingers Raised" for hand in self.hands])
+        np.testing.assert_allclose(pinch_distance(self.points), [hand["pinch"] for hand in self.hands], atol=1e-4)
+
+    def test_single_hand_and_mediapipe_conversion_match_batch(self):
+        hand = landmark_objects(self.points[3])
+        np.testing.assert_array_equal(hand_array(hand), self.points[3])
+        self.assertEqual(hands_array([hand, hand]).shape, (2, 21, 3))
+        self.assertEqual(hands_array(None).shape, (0, 21, 3))
+        self.assertEqual(gestures(self.points[3]), self.hands[3]["gesture"])
+        frames = np.stack([self.points, self.points[::-1]])  # (frames, hands, 21, 3)
+        np.testing.assert_array_equal(gesture_ids(frames)[1], gesture_ids(self.points)[::-1])
+
+    def test_matches_legacy_logic_on_random_hands(self):
+        points = np.random.default_rng(0).random((500, 21, 3), dtype=np.float32)
+        up = fingers_up(points)
+        labels = gestures(points)
+        for i in range(len(points)):
+            names, gesture = legacy_hand_stats(landmark_objects(points[i]))
+            self.assertEqual((raised_names(up[i]), labels[i]), (", ".join(names) or "No Fingers Raised", gesture))
+
+
+class ChatHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="history")
+        other = User.objects.create(username="other")
+        Chat.objects.bulk_create(
+            [Chat(user=self.user, message=f"message {i} " + "x" * 100, response="ok") for i in range(7)]
+            + [Chat(user=other, message="not mine", response="ok")]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_walks_all_rows_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/chat/history/", params)
+            self.assertEqual(response.status_code, 200)
+            seen += [row["id"] for row in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+        expected = list(Chat.objects.filter(user=self.user).order_by("-timestamp", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_preview_truncates_text(self):
+        response = self.client.get("/api/chat/history/", {"preview": "1", "limit": 1})
+        row = response.data["results"][0]
+        self.assertEqual(len(row["message_preview"]), 50)
+        self.assertNotIn("message", row)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/chat/history/", {"cursor": "!!"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CHAT_CLASSIFY_MAX_MESSAGES=50, CHAT_CLASSIFY_REQUEST_COST=10, CHAT_CLASSIFY_MESSAGE_COST=2)
+class ClassifyEndpointTests(TestCase):
+    def setUp(self):
+        self.bundle = make_bundle(n_classes=5)
+        patcher = mock.patch("chat.inference_pool.get_bundle", return_value=self.bundle)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create(username="classify", tokens=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_top_k_matches_full_sort(self):
+        messages = training_patterns()
+        proba = self.bundle.predict_proba(messages)
+        for row, probs in zip(self.bundle.top_k(messages, k=3), proba):
+            expected = np.argsort(-probs, kind="stable")[:3]
+            self.assertEqual([intent for intent, _ in row], [self.bundle.classes[i] for i in expected])
+            np.testing.assert_allclose([p for _, p in row], probs[expected], rtol=1e-6)
+
+    def test_batch_is_charged_once_by_pricing_rule(self):
+        messages = ["hello", "hi there", "good morning"]
+        response = self.client.post("/api/chat/classify/", {"messages": messages, "top_k": 2}, format="json")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual([row[0]["intent"] for row in results], self.bundle.predict(messages))
+        self.assertTrue(all(len(row) == 2 and row[0]["probability"] >= row[1]["probability"] for row in results))
+        self.assertEqual((response.data["cost"], response.data["remaining_tokens"]), (16, 84))
+        self.assertFalse(Chat.objects.exists())
+
+    def test_rejects_non_integer_top_k(self):
+        for top_k in (1.7, True, "2", None):
+            with self.subTest(top_k=top_k):
+                response = self.client.post("/api/chat/classify/", {"messages": ["hi"], "top_k": top_k}, format="json")
+                self.assertEqual(response.data, {"error": "top_k must be an integer"})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.tokens, 100)
+
+    def test_rejects_oversized_or_unaffordable_batches(self):
+        response = self.client.post("/api/chat/classify/", {"messages": ["hi"] * 51}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/chat/classify/", {"messages": ["hi"] * 46}, format="json")
+        self.assertEqual(response.data, {"error": "Insufficient tokens"})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.tokens, 100)
+
+
+class IntentCacheTests(SimpleTestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize("  Hello,   THERE!! "), "hello there")
+
+    def test_equal_keys_mean_equal_features(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        analyze = TfidfVectorizer().build_analyzer()
+        pairs = [("don't go", "dont go"), ("e-mail me", "email me"), ("Straße", "strasse"), ("HI!", "hi"),
+                 ("what's up?", "whats up"), ("Hello,world", "hello world")]
+        for a, b in pairs:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(normalize(a) == normalize(b), analyze(a) == analyze(b))
+
+    def test_prediction_is_cached_under_the_version_that_made_it(self):
+        from .views import predict_intent
+
+        cache = IntentCache(name="test_versioned")
+        with mock.patch("chat.views.get_intent_cache", return_value=cache), \
+                mock.patch("chat.views.model_version", return_value="v1"), \
+                mock.patch("chat.views.predict_labels", return_value=("v2", ["greeting"])):
+            self.assertEqual(predict_intent("hello"), "greeting")
+        self.assertIsNone(cache.get("hello", "v1"))
+        self.assertEqual(cache.get("hello", "v2"), "greeting")
+
+    def test_lru_eviction_and_version_invalidation(self):
+        cache = IntentCache(max_entries=2, name="test_intent_cache")
+        cache.set("hi", "v1", "greeting")
+        cache.set("bye", "v1", "goodbye")
+        self.assertEqual(cache.get("HI!", "v1"), "greeting")
+        cache.set("thanks", "v1", "thanks")  # evicts "bye", the least recently used
+        self.assertIsNone(cache.get("bye", "v1"))
+        self.assertIsNone(cache.get("hi", "v2"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_shared_backend_fills_local_misses(self):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        shared = LocMemCache("intent-test", {})
+        IntentCache(shared=shared, name="test_writer").set("hi", "v1", "greeting")
+        reader = IntentCache(shared=shared, name="test_reader")
+        self.assertEqual(reader.get("hi", "v1"), "greeting")
+
+
+@override_settings(USER_CACHE=True)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="poller", tokens=1000)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_polling_hits_skip_the_database(self):
+        self.client.get("/api/token-balance/balance/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/token-balance/balance/")
+        self.assertEqual(response.data, {"tokens": 1000})
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/user-details/details/")
+        self.assertEqual(response.data, {"username": "poller", "tokens": 1000})
+
+    @mock.patch("chat.views.predict_intent", return_value="greeting")
+    def test_debit_writes_balance_through(self, _predict):
+        self.client.get("/api/token-balance/balance/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/chat/send_message/", {"message": "hi"}, format="json")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/token-balance/balance/")
+        self.assertEqual(response.data, {"tokens": 900})
+
+    def test_cached_user_loads_other_fields_and_saves_only_cached_ones(self):
+        from .authentication import CachedTokenAuthentication
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, password="hashed")
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, _ = auth.authenticate_credentials(self.token.key)
+            self.assertEqual((user.username, user.tokens), ("poller", 1000))
+        user.save()
+        self.assertTrue(user.is_staff)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.is_staff, self.user.password), (True, "hashed"))
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get("/api/token-balance/balance/")
+        self.token.delete()
+        self.assertEqual(self.client.get("/api/token-balance/balance/").status_code, 401)
+
+
+class EventStreamTests(TestCase):
+    async def test_stream_pushes_published_events(self):
+        user = await User.objects.acreate(username="listener", tokens=700)
+        token = await Token.objects.acreate(user=user)
+
+        response = await self.async_client.post("/api/events/ticket/", headers={"Authorization": f"Token {token.key}"})
+        response = await self.async_client.get("/api/events/", {"ticket": response.json()["ticket"]})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'event: balance\ndata: {"tokens": 700}\n\n')
+
+        first_event = asyncio.ensure_future(anext(chunks))
+        while not broker.subscriber_count():
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(broker.publish, user.pk, "balance", {"tokens": 600})
+        self.assertEqual(await first_event, b'event: balance\ndata: {"tokens": 600}\n\n')
+        await chunks.aclose()
+        del chunks, response
+        gc.collect()
+        for _ in range(100):
+            if not broker.subscriber_count():
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_rejects_bad_token(self):
+        response = await self.async_client.get("/api/events/", headers={"Authorization": "Token nope"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_ticket_is_single_use_and_api_token_stays_out_of_urls(self):
+        from .events import issue_ticket
+
+        user = await User.objects.acreate(username="ticketed", tokens=5)
+        token = await Token.objects.acreate(user=user)
+        response = await self.async_client.get("/api/events/", {"token": token.key})
+        self.assertEqual(response.status_code, 401)
+
+        ticket = issue_ticket(user.pk)
+        self.assertNotIn(token.key, ticket)
+        response = await self.async_client.get("/api/events/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+        response = await self.async_client.get("/api/events/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get("/api/events/", {"ticket": ticket[:-1] + "x"})
+        self.assertEqual(response.status_code, 401)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="async", tokens=150)
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {"Authorization": f"Token {self.token.key}"}
+
+    @mock.patch("chat.async_views.predict_intent", return_value="greeting")
+    async def test_send_message_debits_and_stores(self, _predict):
+        response = await self.async_client.post(
+            "/api/async/chat/send_message/", {"message": "hi"},
+            content_type="application/json", headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["remaining_tokens"], 50)
+        self.assertEqual(await Chat.objects.filter(user=self.user).acount(), 1)
+
+        response = await self.async_client.post(
+            "/api/async/chat/send_message/", {"message": "hi"},
+            content_type="application/json", headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Insufficient tokens"})
+
+    async def test_non_object_body_is_rejected(self):
+        response = await self.async_client.post(
+            "/api/async/chat/send_message/", [], content_type="application/json", headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=True)
+    async def test_inference_spans_reach_the_request_trace(self):
+        def predict(message):
+            with span("intent_cache"):
+                return "greeting"
+
+        with mock.patch("chat.async_views.predict_intent", side_effect=predict):
+            response = await self.async_client.post(
+                "/api/async/chat/send_message/", {"message": "hi"},
+                content_type="application/json", headers=self.headers,
+            )
+        self.assertIn("intent_cache;", response["Server-Timing"])
+
+    async def test_balance_and_details(self):
+        response = await self.async_client.get("/api/async/token-balance/balance/", headers=self.headers)
+        self.assertEqual(response.json(), {"tokens": 150})
+        response = await self.async_client.get("/api/async/user-details/details/", headers=self.headers)
+        self.assertEqual(response.json(), {"username": "async", "tokens": 150})
+        response = await self.async_client.get("/api/async/user-details/details/")
+        self.assertEqual(response.status_code, 401)
+
+
+class ModelHolderTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = self.settings(INTENT_MODEL_DIR=tmp.name, INTENT_MODEL_VERSION=None)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def publish(self, version):
+        bundle = make_bundle()
+        bundle.version = version
+        intent_model.publish(bundle)
+        return bundle
+
+    def test_check_swaps_to_newly_published_version(self):
+        self.publish("v1")
+        holder = intent_model.ModelHolder()
+        in_flight = holder.get()
+        self.assertFalse(holder.check())
+
+        self.publish("v2")
+        self.assertTrue(holder.check())
+        self.assertEqual(holder.get().version, "v2")
+        # The swapped-in bundle is already warm; a held reference keeps serving v1
+        self.assertIsNotNone(holder.get()._network)
+        self.assertEqual(in_flight.version, "v1")
+
+    def test_missing_bundle_raises_instead_of_training(self):
+        holder = intent_model.ModelHolder()
+        with mock.patch("chat.intent_model.train") as train, \
+                self.assertRaisesMessage(LookupError, "manage.py train_intent_model"):
+            holder.get()
+        train.assert_not_called()
+
+    def test_failed_reload_is_retried(self):
+        self.publish("v1")
+        holder = intent_model.ModelHolder()
+        holder.get()
+        self.publish("v2")
+        with mock.patch("chat.intent_model.warm_up", side_effect=OSError("disk")):
+            with self.assertRaises(OSError):
+                holder.check()
+        self.assertTrue(holder.check())
+        self.assertEqual(holder.get().version, "v2")
+
+    def test_pinned_version_is_not_swapped_and_watcher_reloads(self):
+        self.publish("v1")
+        with self.settings(INTENT_MODEL_VERSION="v1"):
+            holder = intent_model.ModelHolder()
+            holder.get()
+            self.publish("v2")
+            self.assertFalse(holder.check())
+            self.assertEqual(holder.get().version, "v1")
+
+        holder = intent_model.ModelHolder(interval=0.01)
+        self.addCleanup(holder.stop_watching)
+        self.assertEqual(holder.get().version, "v2")
+        self.publish("v3")
+        deadline = time.monotonic() + 5
+        while holder.get().version != "v3" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(holder.get().version, "v3")
+
+
+class InferencePoolTests(SimpleTestCase):
+    def test_shared_vocabulary_matches_the_vectorizer(self):
+        bundle = make_bundle()
+        messages = training_patterns() + ["don't know", "Straße e-mail", "zzz unknown words", ""]
+        expected = bundle.vectorizer.transform(messages)
+        vocabulary = dict(bundle.vocabulary)
+
+        shared = share_bundle(bundle)
+        self.addCleanup(shared.close)
+        self.assertEqual(dict(bundle.vocabulary), vocabulary)
+        self.assertNotIn("zzz", bundle.vocabulary)
+        features = bundle.vectorizer.transform(messages)
+        np.testing.assert_allclose(features.toarray(), expected.toarray(), rtol=1e-6)
+
+    def test_pool_workers_match_local_predictions(self):
+        bundle = make_bundle()
+        messages = training_patterns()
+        expected = bundle.predict(messages)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        pool = InferencePool(f"{tmp.name}/pool.sock", workers=2, holder=ModelHolder(bundle=bundle)).start()
+        self.addCleanup(pool.stop)
+
+        client = PoolClient(pool.address)
+        self.assertEqual(client.predict(messages), ("test", expected))
+        self.assertEqual(client.model_version(), "test")
+
+    def test_reload_rolls_workers_over_to_new_version(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with self.settings(INTENT_MODEL_DIR=f"{tmp.name}/models", INTENT_MODEL_VERSION=None):
+            intent_model.publish(make_bundle())
+            pool = InferencePool(f"{tmp.name}/pool.sock", workers=2).start()
+            self.addCleanup(pool.stop)
+            client = PoolClient(pool.address, version_ttl=0)
+            client.predict(["hello"] * 4)
+            old_pids = {p.pid for p in pool.processes}
+
+            new = make_bundle(n_classes=4, seed=1)
+            new.version = "v2"
+            intent_model.publish(new)
+            self.assertTrue(pool.reload())
+            self.assertFalse(old_pids & {p.pid for p in pool.processes})
+            # The new version is seen without a predict call (e.g. while the intent cache is warm)
+            self.assertEqual(client.model_version(), "v2")
+            # Pooled connections to retired workers are replaced transparently
+            for _ in range(4):
+                self.assertEqual(client.predict(["hello"]), ("v2", new.predict(["hello"])))
+
+
+class StreamingTrainingTests(SimpleTestCase):
+    def test_streamed_vocabulary_matches_sklearn_and_model_learns(self):
+        import pandas as pd
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        from .management.commands.bench_training import write_synthetic_csv
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = f"{tmp.name}/train.csv"
+        write_synthetic_csv(path, rows=600, intents=3, words_per_intent=20)
+
+        scan = intent_model.scan_vocabulary(path, chunksize=128)
+        fitted = TfidfVectorizer().fit(pd.read_csv(path)["pattern"])
+        self.assertEqual(scan.vocabulary, fitted.vocabulary_)
+        np.testing.assert_allclose(scan.idf, fitted.idf_)
+        self.assertEqual((scan.classes, scan.rows), (["intent_0", "intent_1", "intent_2"], 600))
+
+        bundle = intent_model.train(path, epochs=15, chunksize=128)
+        df = pd.read_csv(path)
+        accuracy = np.mean(np.array(bundle.predict(df["pattern"].tolist())) == df["intent"].to_numpy())
+        self.assertGreater(accuracy, 0.9)
+
+
+class IncrementalTrainingTests(TestCase):
+    def setUp(self):
+        import tensorflow as tf
+
+        # Fixed weight initialisation, so the forgetting check below is deterministic
+        tf.keras.utils.set_random_seed(0)
+
+    def test_new_rows_extend_vocabulary_and_classes(self):
+        import pandas as pd
+
+        from .management.commands.bench_training import write_synthetic_csv
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = f"{tmp.name}/train.csv"
+        write_synthetic_csv(path, rows=300, intents=2, words_per_intent=20)
+        base = intent_model.train(path, epochs=15)
+        self.assertIsNone(intent_model.train_incremental(base, path))
+
+        # A new intent with unseen words appears in the CSV, plus a logged chat
+        with open(path, "a", encoding="utf-8") as f:
+            for i in range(40):
+                f.write(f"farewell,goodbye friend {i % 5} later,Bye!\n")
+        user = User.objects.create(username="incremental")
+        chat = Chat.objects.create(user=user, message="goodbye friend", response="Predicted intent: farewell")
+
+        # Self-labelled chats are only used when asked for
+        bundle = intent_model.train_incremental(base, path, epochs=30)
+        self.assertEqual(bundle.meta["parent"], base.version)
+        self.assertEqual((bundle.meta["chat_watermark"], bundle.meta["incremental_rows"]), (0, 40))
+        with_chats = intent_model.train_incremental(base, path, epochs=1, include_chats=True)
+        self.assertEqual((with_chats.meta["chat_watermark"], with_chats.meta["incremental_rows"]), (chat.id, 41))
+        self.assertEqual(bundle.classes, base.classes + ["farewell"])
+        self.assertIn("goodbye", bundle.vocabulary)
+        # Existing feature indices never move
+        self.assertTrue(all(bundle.vocabulary[t] == i for t, i in base.vocabulary.items()))
+        self.assertEqual(bundle.predict(["goodbye friend later"]), ["farewell"])
+        # Replayed old rows keep the model from forgetting the original intents
+        old = pd.read_csv(path).iloc[:300]
+
+        def accuracy(b):
+            return np.mean(np.array(b.predict(old["pattern"].tolist())) == old["intent"].to_numpy())
+
+        self.assertGreaterEqual(accuracy(bundle), min(accuracy(base), 0.9) - 0.05)
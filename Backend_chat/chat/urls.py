@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import UserViewSet, AuthViewSet, ChatViewSet, UserDetailViewSet, TokenBalanceViewSet
 
 # Initialize the router
@@ -11,5 +12,11 @@ router.register(r'user-details', UserDetailViewSet, basename='user-details')
 router.register(r'token-balance', TokenBalanceViewSet, basename='token-balance')
 
 urlpatterns = [
+    path('events/', async_views.event_stream, name='events'),
+    path('events/ticket/', async_views.event_ticket, name='events-ticket'),
+    # Native async variants for the ASGI entry point
+    path('async/chat/send_message/', async_views.send_message, name='async-send-message'),
+    path('async/token-balance/balance/', async_views.balance, name='async-balance'),
+    path('async/user-details/details/', async_views.details, name='async-details'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+# --- CACHE-ASIDE USER READS ---
+# Three kinds of entries back the polled read endpoints:
+#   auth-token:<key> -> user id            (dropped when the Token is deleted)
+#   user:<id>        -> username/is_active (dropped when the User is saved)
+#   balance:<id>     -> token balance      (written through by debit_tokens)
+# With a per-process cache (LocMemCache) the signals only clear the local
+# process: other workers accept a deleted token for up to USER_CACHE_TTL
+# seconds and show a balance up to USER_CACHE_BALANCE_TTL seconds old. The
+# cache is therefore off unless USER_CACHE is set, which should only be done
+# with a shared backend such as Redis.
+
+def enabled():
+    return getattr(settings, "USER_CACHE", False)
+
+
+def _cache():
+    return caches[getattr(settings, "USER_CACHE_ALIAS", "default")]
+
+
+def _ttl():
+    return getattr(settings, "USER_CACHE_TTL", 30)
+
+
+def _balance_ttl():
+    return getattr(settings, "USER_CACHE_BALANCE_TTL", 60)
+
+
+def get_user_id(token_key):
+    return _cache().get(f"auth-token:{token_key}")
+
+
+def get_user_state(user_id):
+    """``(profile, balance)`` for a user, either of which may be None on a miss."""
+    entries = _cache().get_many([f"user:{user_id}", f"balance:{user_id}"])
+    return entries.get(f"user:{user_id}"), entries.get(f"balance:{user_id}")
+
+
+def remember(token_key, user):
+    _cache().set_many({
+        f"auth-token:{token_key}": user.pk,
+        f"user:{user.pk}": {"username": user.username, "is_active": user.is_active},
+    }, _ttl())
+    set_balance(user.pk, user.tokens)
+
+
+def set_balance(user_id, tokens):
+    _cache().set(f"balance:{user_id}", tokens, _balance_ttl())
+
+
+async def _acall(method, *args):
+    cache = _cache()
+    if isinstance(cache, LocMemCache):
+        # In-process and never blocks on I/O, so skip the thread hop that
+        # Django's default async cache methods make.
+        return getattr(cache, method)(*args)
+    return await getattr(cache, f"a{method}")(*args)
+
+
+async def aget_user_id(token_key):
+    return await _acall("get", f"auth-token:{token_key}")
+
+
+async def aget_user_state(user_id):
+    entries = await _acall("get_many", [f"user:{user_id}", f"balance:{user_id}"])
+    return entries.get(f"user:{user_id}"), entries.get(f"balance:{user_id}")
+
+
+async def aremember(token_key, user):
+    await _acall("set_many", {
+        f"auth-token:{token_key}": user.pk,
+        f"user:{user.pk}": {"username": user.username, "is_active": user.is_active},
+    }, _ttl())
+    await aset_balance(user.pk, user.tokens)
+
+
+async def aset_balance(user_id, tokens):
+    await _acall("set", f"balance:{user_id}", tokens, _balance_ttl())
+
+
+def forget_token(token_key):
+    _cache().delete(f"auth-token:{token_key}")
+
+
+def forget_user(user_id):
+    _cache().delete_many([f"user:{user_id}", f"balance:{user_id}"])
@@ -1,66 +1,51 @@
-import os
-import numpy as np
-import pandas as pd
-import tensorflow as tf
-from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.hashers import make_password
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.models import Token
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
+from django.conf import settings
+from django.db.models.functions import Substr
+from .accounting import charge_message, classify_cost, debit_tokens
+from .authentication import CachedTokenAuthentication
+from .batching import get_intent_batcher
+from .events import broker
+from .intent_cache import get_intent_cache
+from .instrumentation import span
+from .inference_pool import model_version, predict_labels, predict_top_k
 from .models import Chat
-from .serializers import UserSerializer
+from .pagination import keyset_page
+from .serializers import ChatPreviewSerializer, ChatSerializer, UserSerializer
 
 User = get_user_model()
 
-# --- LOAD AND TRAIN MODEL ---
-# Define file paths
-csv_path = os.path.join(os.path.dirname(__file__), "training_data.csv")
-model_path = os.path.join(os.path.dirname(__file__), "simple_greeting_model.h5")
-
-# Load dataset
-df = pd.read_csv(csv_path, encoding="utf-8", on_bad_lines="skip")
-
-# Handle missing values
-df = df.dropna()
-
-# Convert text to numerical features using TF-IDF
-vectorizer = TfidfVectorizer()
-X_tfidf = vectorizer.fit_transform(df["pattern"]).toarray()
-
-# Encode intent labels
-label_encoder = LabelEncoder()
-y_train = label_encoder.fit_transform(df["intent"])
-
-# Define a simple neural network
-model = tf.keras.Sequential([
-    tf.keras.layers.Dense(16, activation="relu", input_shape=(X_tfidf.shape[1],)),
-    tf.keras.layers.Dense(16, activation="relu"),
-    tf.keras.layers.Dense(len(label_encoder.classes_), activation="softmax")
-])
-
-# Compile the model
-model.compile(loss="sparse_categorical_crossentropy", optimizer="adam", metrics=["accuracy"])
-
-# Train the model
-model.fit(X_tfidf, y_train, epochs=50, verbose=1)
-
-# Save the model
-model.save(model_path)
-
 # --- FUNCTION FOR PREDICTION ---
+# The model is trained offline with `manage.py train_intent_model` and loaded
+# lazily from the artifact registry on first use, either in this process or
+# in the inference pool (`manage.py run_inference_pool`).
+def _predict_uncached(message):
+    """``(model_version, intent)``: the version is the one that actually answered."""
+    with span('predict'):
+        if getattr(settings, 'INTENT_BATCHING', False):
+            # Share one vectorize + forward pass with concurrent requests
+            return get_intent_batcher().submit(message)
+        version, labels = predict_labels([message])
+        return version, labels[0]
+
 def predict_intent(message):
     """Predict the intent of a given user message."""
-    message_tfidf = vectorizer.transform([message]).toarray()
-    prediction = model.predict(message_tfidf)
-    predicted_intent_index = np.argmax(prediction)
-    predicted_intent = label_encoder.inverse_transform([predicted_intent_index])[0]
-
+    cache = get_intent_cache()
+    if cache is None:
+        return _predict_uncached(message)[1]
+
+    with span("intent_cache"):
+        predicted_intent = cache.get(message, model_version())
+    if predicted_intent is None:
+        # Stored under the version that produced it, even if a reload happened since the lookup
+        version, predicted_intent = _predict_uncached(message)
+        with span("intent_cache"):
+            cache.set(message, version, predicted_intent)
     return predicted_intent
 
 # --- DJANGO API VIEWS ---
@@ -99,7 +84,7 @@ class AuthViewSet(viewsets.ViewSet):
         return Response({'error': 'Invalid credentials'}, status=400)
 
 class ChatViewSet(viewsets.ViewSet):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['post'])
@@ -110,7 +95,11 @@ class ChatViewSet(viewsets.ViewSet):
         if not message:
             return Response({'error': 'Message is required'}, status=400)
 
-        if user.tokens < 100:
+        cost = getattr(settings, 'CHAT_MESSAGE_COST', 100)
+
+        # Cheap pre-check so broke users don't pay for inference; the debit
+        # below is what actually enforces the balance.
+        if user.tokens < cost:
             return Response({'error': 'Insufficient tokens'}, status=400)
 
         # Predict intent using the trained ML model
@@ -119,22 +108,109 @@ class ChatViewSet(viewsets.ViewSet):
         # Generate a response based on intent
         response_text = f"Predicted intent: {predicted_intent}"  # Modify this to return better responses
 
-        # Deduct tokens
-        user.tokens -= 100
-        user.save()
+        # Deduct tokens and store the chat in one short transaction
+        remaining_tokens = charge_message(user, message, response_text, cost)
+        if remaining_tokens is None:
+            return Response({'error': 'Insufficient tokens'}, status=400)
+        user.tokens = remaining_tokens
 
-        # Store chat in database
-        chat = Chat.objects.create(user=user, message=message, response=response_text)
+        # Push to any open event streams of this user
+        broker.publish(user.pk, 'reply', {
+            'message': message,
+            'response': response_text,
+            'predicted_intent': predicted_intent,
+        })
+        broker.publish(user.pk, 'balance', {'tokens': remaining_tokens})
 
         return Response({
             'message': message,
             'response': response_text,
             'predicted_intent': predicted_intent,
-            'remaining_tokens': user.tokens
+            'remaining_tokens': remaining_tokens
+        })
+
+    @action(detail=False, methods=['post'])
+    def classify(self, request):
+        """Top-k intents with probabilities for a batch of messages, in one pass.
+
+        Body: ``{"messages": [...], "top_k": 3}``. Charged once per request
+        (see ``classify_cost``); nothing is stored in the chat history.
+        """
+        messages = request.data.get('messages')
+        max_messages = getattr(settings, 'CHAT_CLASSIFY_MAX_MESSAGES', 1000)
+        if not isinstance(messages, list) or not messages:
+            return Response({'error': 'messages must be a non-empty list'}, status=400)
+        if len(messages) > max_messages:
+            return Response({'error': f'At most {max_messages} messages per request'}, status=400)
+        if not all(isinstance(m, str) and m for m in messages):
+            return Response({'error': 'messages must be non-empty strings'}, status=400)
+        top_k = request.data.get('top_k', 3)
+        # int() would truncate 1.7 and accept True; only a JSON integer will do
+        if type(top_k) is not int:
+            return Response({'error': 'top_k must be an integer'}, status=400)
+        if not 1 <= top_k <= getattr(settings, 'CHAT_CLASSIFY_MAX_TOP_K', 10):
+            return Response({'error': 'top_k out of range'}, status=400)
+
+        user = request.user
+        cost = classify_cost(len(messages))
+        if user.tokens < cost:
+            return Response({'error': 'Insufficient tokens'}, status=400)
+
+        version, results = predict_top_k(messages, top_k)
+
+        remaining_tokens = debit_tokens(user.pk, cost)
+        if remaining_tokens is None:
+            return Response({'error': 'Insufficient tokens'}, status=400)
+        user.tokens = remaining_tokens
+        broker.publish(user.pk, 'balance', {'tokens': remaining_tokens})
+
+        return Response({
+            'model_version': version,
+            'results': [
+                [{'intent': intent, 'probability': probability} for intent, probability in row]
+                for row in results
+            ],
+            'cost': cost,
+            'remaining_tokens': remaining_tokens,
+        })
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """The user's chats, newest first, paginated with an opaque ``cursor``.
+
+        ``?preview=1`` returns truncated message/response previews without
+        loading the full text columns.
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=400)
+        if limit < 1:
+            return Response({'error': 'limit must be positive'}, status=400)
+
+        chats = Chat.objects.filter(user=request.user)
+        if request.query_params.get('preview') in ('1', 'true'):
+            chats = chats.only('id', 'user', 'timestamp').annotate(
+                message_preview=Substr('message', 1, 50),
+                response_preview=Substr('response', 1, 50),
+            )
+            serializer_class = ChatPreviewSerializer
+        else:
+            chats = chats.only('id', 'user', 'message', 'response', 'timestamp')
+            serializer_class = ChatSerializer
+
+        try:
+            rows, next_cursor = keyset_page(chats, request.query_params.get('cursor'), limit)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+
+        return Response({
+            'results': serializer_class(rows, many=True).data,
+            'next_cursor': next_cursor,
         })
 
 class UserDetailViewSet(viewsets.ViewSet):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'])
@@ -145,7 +221,7 @@ class UserDetailViewSet(viewsets.ViewSet):
         })
 
 class TokenBalanceViewSet(viewsets.ViewSet):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'])
@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# --- RECOGNIZER BACKENDS ---
+# A backend has ``calibrate()``, called once before listening, and
+# ``listen()``, which blocks until it has heard something and returns the
+# recognised text (lower-cased) or "" when nothing was understood.
+
+
+class SpeechRecognitionBackend:
+    """Microphone input through ``speech_recognition``, recognised by Google or, offline, Sphinx."""
+
+    def __init__(self, engine="google", phrase_time_limit=5):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.engine = engine
+        self.phrase_time_limit = phrase_time_limit
+        self.recognizer = sr.Recognizer()
+        self.microphone = sr.Microphone()
+
+    def calibrate(self, duration=1.0):
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+
+    def listen(self):
+        with self.microphone as source:
+            audio = self.recognizer.listen(source, phrase_time_limit=self.phrase_time_limit)
+        recognize = getattr(self.recognizer, f"recognize_{self.engine}")
+        try:
+            return recognize(audio).lower()
+        except (self.sr.UnknownValueError, self.sr.RequestError):
+            return ""
+
+
+class StubBackend:
+    """Replays scripted commands, ``delay`` seconds apart; for tests and headless runs."""
+
+    def __init__(self, commands=(), delay=0.0):
+        self.commands = list(commands)
+        self.delay = delay
+        self.calibrations = 0
+
+    def calibrate(self, duration=1.0):
+        self.calibrations += 1
+
+    def listen(self):
+        time.sleep(self.delay)
+        if not self.commands:
+            raise EOFError("No more scripted commands")
+        return self.commands.pop(0).lower()
+
+
+# --- LISTENER ---
+class VoiceListener:
+    """Listen and recognise in a background thread; recognised commands land on a queue.
+
+    Ambient noise is calibrated once when the thread starts. The frame loop
+    calls ``poll()``, which never blocks, and dispatches whatever it returns.
+    The listener stops when ``stop()`` is called or the backend raises EOFError.
+    """
+
+    def __init__(self, backend, max_pending=16):
+        self.backend = backend
+        self.commands = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="voice-listener", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.backend.calibrate()
+            while not self._stopping.is_set():
+                command = self.backend.listen()
+                if command and not self._stopping.is_set():
+                    try:
+                        self.commands.put_nowait(command)
+                    except queue.Full:
+                        logger.warning("Dropping voice command %r; the frame loop is not draining them", command)
+        except EOFError:
+            pass
+        except Exception:
+            logger.exception("Voice listener stopped")
+
+    def poll(self):
+        """Every command recognised since the last call, oldest first."""
+        commands = []
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def stop(self, timeout=None):
+        """Ask the thread to stop; it finishes after the ``listen()`` in progress returns."""
+        self._stopping.set()
+        self._thread.join(timeout)
@@ -60,6 +60,46 @@ export default function Dashboard() {
     fetchUserProfile(token);
   }, []);
 
+  // Balance updates are pushed by the server instead of polled
+  useEffect(() => {
+    const token = localStorage.getItem("accessToken");
+    if (!token) return;
+
+    // The stream URL carries a short-lived single-use ticket, never the API token,
+    // so every (re)connection asks for a fresh one
+    let events = null;
+    let retry = null;
+    let closed = false;
+
+    async function connect() {
+      try {
+        const response = await axios.post("http://127.0.0.1:8000/api/events/ticket/", null, {
+          headers: { Authorization: `Token ${token}` },
+        });
+        if (closed) return;
+        events = new EventSource(`http://127.0.0.1:8000/api/events/?ticket=${encodeURIComponent(response.data.ticket)}`);
+        events.addEventListener("balance", (event) => {
+          const { tokens } = JSON.parse(event.data);
+          setUserDetails((prev) => ({ ...prev, tokens }));
+          setUser((prev) => (prev ? { ...prev, tokens } : prev));
+        });
+        events.onerror = () => {
+          events.close();
+          if (!closed) retry = setTimeout(connect, 3000);
+        };
+      } catch (error) {
+        if (!closed) retry = setTimeout(connect, 3000);
+      }
+    }
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      if (events) events.close();
+    };
+  }, []);
+
   // Fetch user profile
   async function fetchUserProfile(token) {  
     try {